@@ -0,0 +1,133 @@
+import time
+import hashlib
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from base.helpers.transaction import on_commit_once
+
+VERSION_CACHE_PREFIX = "versions"
+VERSIONED_CACHE_TIMEOUT = 60 * 60 * 24
+# versions only ever move forward, one that expired comes back as a later
+# time, which invalidates what it validated but never validates stale data.
+# The timeout keeps reads of unknown ids from piling up keys.
+VERSION_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _version_key(scope):
+    return f"{VERSION_CACHE_PREFIX}:{scope}"
+
+
+def get_version(scope):
+    """
+    Return the version of a resource scope, i.e. the timestamp of its last change.
+    A scope without a stored version (new or evicted) starts at the current time.
+    """
+    version = cache.get(_version_key(scope))
+    if version is None:
+        version = time.time()
+        cache.add(_version_key(scope), version, VERSION_TIMEOUT)
+        version = cache.get(_version_key(scope)) or version
+    return version
+
+
+def get_versions(*scopes):
+    """Versions of many scopes with one cache round trip, keyed by scope"""
+    found = cache.get_many([_version_key(scope) for scope in scopes])
+    return {
+        scope: found[_version_key(scope)] if _version_key(scope) in found else get_version(scope)
+        for scope in scopes
+    }
+
+
+def ensure_versions(scopes, version):
+    """Give the scopes without a stored version the given one, existing versions are kept"""
+    keys = {_version_key(scope) for scope in scopes}
+    for key in keys - cache.get_many(keys).keys():
+        cache.add(key, version, VERSION_TIMEOUT)
+
+
+def _bump_version(scope):
+    cache.set(_version_key(scope), time.time(), VERSION_TIMEOUT)
+
+
+def bump_version(*scopes):
+    """Mark the scopes as changed once the surrounding transaction commits"""
+    for scope in scopes:
+        on_commit_once(_bump_version, scope)
+
+
+def get_versioned(scope, name, build, timeout=VERSIONED_CACHE_TIMEOUT):
+    """
+    Return `build()` cached under the current version of the scope, so a bump
+    of the scope invalidates it without deleting any key
+    """
+    key = f"{_version_key(scope)}:{get_version(scope)}:{name}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout)
+    return data
+
+
+def track_versions(scope, *models):
+    """Bump the scope whenever an instance of any of the models is saved or deleted"""
+    def model_changed(sender, **kwargs):
+        bump_version(scope)
+
+    for model in models:
+        post_save.connect(model_changed, sender=model, weak=False, dispatch_uid=f"versions:{scope}:{model._meta.label}:save")
+        post_delete.connect(model_changed, sender=model, weak=False, dispatch_uid=f"versions:{scope}:{model._meta.label}:delete")
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to a read view and answers
+    `304 Not Modified` before the queryset or serializer runs. The validators
+    come from the version of `version_scope`, bumped by `track_versions` or
+    `bump_version` when the underlying rows change. A view depending on several
+    scopes returns them all, the latest version wins. A view returning no
+    scope, e.g. for a malformed id, is served without validators.
+    """
+    version_scope = None
+
+    def get_version_scope(self):
+        return self.version_scope
+
+    def get_etag(self, scope, version):
+        request = self.request
+        user_id = request.user.pk if request.user.is_authenticated else ''
+        raw = f"{scope}:{version}:{request.get_full_path()}:{user_id}"
+        # weak, bodies may differ in volatile fields such as view counts
+        return f'W/"{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"'
+
+    def not_modified(self, request, response):
+        """Hook for work that has to happen even when the body is not sent"""
+        return response
+
+    def get(self, request, *args, **kwargs):
+        scope = self.get_version_scope()
+        if not scope:
+            return super().get(request, *args, **kwargs)
+        if isinstance(scope, (list, tuple)):
+            version = max(get_versions(*scope).values())
+            scope = ','.join(scope)
+        else:
+            version = get_version(scope)
+        etag = self.get_etag(scope, version)
+        last_modified = int(version)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            response['ETag'] = etag
+            return self.not_modified(request, response)
+
+        response = super().get(request, *args, **kwargs)
+        # a stale body served while it is rendered again must not be validated as current
+        if response.status_code == 200 and not getattr(self, 'response_stale', False):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,166 @@
+import io
+import os
+import base64
+import logging
+from celery import shared_task
+from PIL import Image, ImageOps, features
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from rest_framework import serializers
+
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_QUALITY = 80
+PLACEHOLDER_SIZE = 16
+
+# avif needs a pillow build with libavif, webp is always produced
+VARIANT_FORMATS = ('webp', 'avif') if features.check('avif') else ('webp',)
+
+# model label -> image field names with a `<field>_variants` json column
+REGISTRY = {}
+
+
+def variants_field_name(field_name):
+    return f"{field_name}_variants"
+
+
+def _variant_names(variants):
+    for value in variants.values():
+        if isinstance(value, dict):
+            yield from value.values()
+
+
+def _flatten(image):
+    """Normalize orientation and mode so every target format can encode it"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def _encode(image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=VARIANT_QUALITY, **options)
+    return buffer.getvalue()
+
+
+def build_variants(field_file):
+    """
+    Write resized webp/avif copies of an image next to the original and return
+    the variants map: `{format: {width: name}, 'placeholder': data uri, 'source': name}`
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        image = _flatten(Image.open(source))
+
+    stem, _ = os.path.splitext(field_file.name)
+    # never upscale, images narrower than the smallest width keep their own
+    widths = [width for width in VARIANT_WIDTHS if width < image.width] or [image.width]
+    variants = {fmt: {} for fmt in VARIANT_FORMATS}
+
+    for width in widths:
+        resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in VARIANT_FORMATS:
+            name = f"{stem}-{width}w.{fmt}"
+            if storage.exists(name):
+                storage.delete(name)
+            variants[fmt][str(width)] = storage.save(name, ContentFile(_encode(resized, fmt)))
+
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    variants['placeholder'] = "data:image/webp;base64," + base64.b64encode(_encode(tiny, 'webp')).decode()
+    variants['source'] = field_file.name
+    return variants
+
+
+def delete_variants(storage, variants, keep=None):
+    keep = set(_variant_names(keep or {}))
+    for name in _variant_names(variants or {}):
+        if name not in keep:
+            storage.delete(name)
+
+
+def generate_image_variants(model_label, pk, field_name, force=False):
+    """
+    Build the variants of one image field and store the map on the row.
+    Returns False when the row is gone, the image is empty or already processed.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+
+    field_file = getattr(instance, field_name)
+    variants_field = variants_field_name(field_name)
+    previous = getattr(instance, variants_field) or {}
+    if not field_file and not previous:
+        return False
+    if not force and field_file and previous.get('source') == field_file.name:
+        return False
+
+    variants = build_variants(field_file) if field_file else {}
+    delete_variants(field_file.storage, previous, keep=variants)
+
+    setattr(instance, variants_field, variants)
+    # a regular save, so derived documents and versions pick up the new urls
+    instance.save(update_fields=[variants_field])
+    return True
+
+
+def _enqueue_image_variants(model_label, pk, field_name):
+    generate_image_variants_task.delay(model_label, pk, field_name)
+
+
+def schedule_image_variants(instance, field_name):
+    """Queue variant generation for the image field once the transaction commits"""
+    on_commit_once(_enqueue_image_variants, instance._meta.label, str(instance.pk), field_name)
+
+
+def image_saved(sender, instance, **kwargs):
+    for field_name in REGISTRY[sender._meta.label]:
+        field_file = getattr(instance, field_name)
+        variants = getattr(instance, variants_field_name(field_name)) or {}
+        if (field_file.name or None) != variants.get('source'):
+            schedule_image_variants(instance, field_name)
+
+
+def register_image_variants(model, *field_names):
+    """Generate variants in the background whenever the model's image fields change"""
+    REGISTRY.setdefault(model._meta.label, []).extend(field_names)
+    post_save.connect(image_saved, sender=model, dispatch_uid=f"image_variants:{model._meta.label}")
+
+
+@shared_task
+def generate_image_variants_task(model_label, pk, field_name, force=False):
+    """Background task to resize an uploaded image into responsive variants"""
+    if generate_image_variants(model_label, pk, field_name, force=force):
+        logger.info(f"Image variants generated for {model_label} {pk} ({field_name})")
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Exposes a `<field>_variants` map as urls, `{format: {width: url}, 'placeholder': data uri}`.
+    Empty until the background task has processed the image.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+
+        request = self.context.get('request')
+
+        def url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request is not None else url
+
+        data = {
+            fmt: {width: url(name) for width, name in names.items()}
+            for fmt, names in value.items() if isinstance(names, dict)
+        }
+        data['placeholder'] = value.get('placeholder')
+        return data
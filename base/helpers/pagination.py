@@ -1,4 +1,14 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+import base64
+from collections import OrderedDict
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class CustomPagination(PageNumberPagination):
     """
@@ -7,3 +17,153 @@ class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class CustomCursorPagination(BasePagination):
+    """
+    Keyset pagination on (ordering field, pk) with opaque cursors.
+    The ordering field is the first ordering of the filtered queryset, so it
+    follows the view's `ordering` and the `ordering` query param. Pages are
+    fetched with an indexed range condition instead of COUNT + OFFSET.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Report the planner's row estimate of the table instead of a COUNT(*)
+    include_approximate_count = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+
+        self.field, self.descending = self.get_keyset_field(queryset, view)
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor['r'])
+
+        # Walking backwards is the same keyset walk in the opposite direction
+        descending = self.descending != self.reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+        if cursor:
+            queryset = queryset.filter(self._after(self.field, cursor['v'], cursor['pk'], descending))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        self.has_next = has_more if not self.reverse else True
+        self.has_previous = has_more if self.reverse else cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+        if self.include_approximate_count:
+            response['approximate_count'] = self.get_approximate_count()
+        return response
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_keyset_field(self, queryset, view):
+        """Return the leading ordering field and its direction"""
+        ordering = list(queryset.query.order_by) or list(getattr(view, 'ordering', None) or []) \
+            or list(queryset.model._meta.ordering)
+        field = ordering[0] if ordering and isinstance(ordering[0], str) else '-pk'
+        return field.lstrip('-'), field.startswith('-')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        value = instance
+        for attr in self.field.split('__'):
+            value = getattr(value, attr, None) if value is not None else None
+
+        # str() keeps full datetime precision, unlike DjangoJSONEncoder
+        payload = json.dumps({'v': value, 'pk': instance.pk, 'r': int(reverse)}, default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return {'v': cursor['v'], 'pk': cursor['pk'], 'r': int(cursor.get('r', 0))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_approximate_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 means the table was never analyzed
+        return row[0] if row and row[0] >= 0 else None
+
+    @staticmethod
+    def _after(field, value, pk, descending):
+        """
+        Rows strictly after (value, pk) in the given order. Nulls sort as the
+        largest values like postgres does, so plain b-tree indexes serve both directions.
+        """
+        lookup = 'lt' if descending else 'gt'
+        if value is None:
+            condition = Q(**{f'{field}__isnull': True, f'pk__{lookup}': pk})
+            if descending:
+                condition |= Q(**{f'{field}__isnull': False})
+            return condition
+
+        condition = Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk})
+        if not descending:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+
+class CursorPaginationMixin:
+    """
+    Lets a list view opt in to keyset pagination per request with
+    `?pagination=cursor` (or a `cursor` param), keeping page numbers as default
+    """
+    cursor_pagination_class = CustomCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            use_cursor = params.get('pagination') == 'cursor' or 'cursor' in params
+            pagination_class = self.cursor_pagination_class if use_cursor else self.pagination_class
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
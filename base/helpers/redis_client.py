@@ -0,0 +1,16 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Shared redis client for counters and sorted sets that the django cache
+    api can't express. The underlying connection pool is process wide and
+    re-created by redis-py after a fork.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CACHE_URL)
+    return _client
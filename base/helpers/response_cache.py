@@ -0,0 +1,66 @@
+import time
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+from base.helpers.conditional import get_versions, ensure_versions
+
+RESPONSE_CACHE_PREFIX = "responses"
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+REFRESH_LOCK_TIMEOUT = 30
+
+
+def normalize_params(query_params):
+    """Canonical query string, independent of parameter order and empty values"""
+    pairs = []
+    for key in sorted(query_params):
+        pairs.extend((key, value) for value in sorted(query_params.getlist(key)) if value != '')
+    return urlencode(pairs)
+
+
+class TaggedResponseCacheMixin:
+    """
+    Caches the response data of anonymous requests per normalized query string.
+    Each entry is tagged with version scopes (see `bump_version`) and stays fresh
+    while none of them was bumped after it was rendered. A stale entry keeps being
+    served while a single request renders it again, so a purge never lets every
+    concurrent request hit the db at once.
+    """
+    response_cache_prefix = None
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+    response_stale = False
+
+    def get_response_cache_key(self, request):
+        params = hashlib.md5(normalize_params(request.query_params).encode(), usedforsecurity=False).hexdigest()
+        return f"{RESPONSE_CACHE_PREFIX}:{self.response_cache_prefix}:{params}"
+
+    def get_cached_data(self, request, render):
+        """Return the data of `render()`, which returns `(data, tags)`, through the cache"""
+        if request.user.is_authenticated:
+            return render()[0]
+
+        key = self.get_response_cache_key(request)
+        lock_key = f"{key}:refresh"
+        entry = cache.get(key)
+        if entry is not None:
+            versions = get_versions(*entry['tags'])
+            if max(versions.values(), default=0) <= entry['rendered_at']:
+                return entry['data']
+            if not cache.add(lock_key, 1, REFRESH_LOCK_TIMEOUT):
+                # someone else is rendering it again
+                self.response_stale = True
+                return entry['data']
+
+        try:
+            # taken before the queries run, a change committed meanwhile makes the entry stale
+            rendered_at = time.time()
+            data, tags = render()
+            tags = sorted(set(tags))
+            # scopes never bumped so far start at the render, not at their first read
+            ensure_versions(tags, rendered_at)
+            cache.set(key, {'data': data, 'tags': tags, 'rendered_at': rendered_at}, self.response_cache_timeout)
+        finally:
+            if entry is not None:
+                cache.delete(lock_key)
+        return data
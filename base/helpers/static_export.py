@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+EXPORT_LOCK_KEY = 'static-export:lock'
+EXPORT_LOCK_TIMEOUT = 60 * 10
+# functions exporting the groups of an app into a StaticSiteExport, registered by the apps
+EXPORTERS = []
+
+
+def _write_atomic(path, content):
+    """Replace the file in one rename so nginx never serves a half written file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class StaticSiteExport:
+    """
+    Writes the public read payloads as json files under `root`. Files are
+    grouped by the version scope of their source rows (see `ConditionalGetMixin`),
+    a group whose version didn't change since the last export is not rendered
+    again, and rendered files are only rewritten when their content changed.
+    `manifest.json` records the export version and the hash of every file.
+    """
+
+    def __init__(self, root=None, force=False):
+        self.root = str(root or settings.STATIC_EXPORT_ROOT)
+        self.force = force
+        self.previous = self._load_manifest()
+        self.groups = {}
+        self.files = {}
+        self.written = 0
+        self.removed = 0
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME)) as f:
+                manifest = json.load(f)
+            return manifest if {'version', 'groups', 'files'} <= manifest.keys() else None
+        except (OSError, ValueError):
+            return None
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def is_stale(self, group, source):
+        previous_group = (self.previous or {'groups': {}})['groups'].get(group)
+        return self.force or not previous_group or previous_group['source'] != source \
+            or not all(os.path.exists(self._path(name)) for name in previous_group['files'])
+
+    def export_group(self, group, source, render):
+        """
+        Export the files of a group, `render` returns `(name, data)` pairs and is
+        only called when the group's source version changed since the last export
+        """
+        previous = self.previous or {'groups': {}, 'files': {}}
+        if not self.is_stale(group, source):
+            previous_group = previous['groups'][group]
+            self.groups[group] = previous_group
+            self.files.update({name: previous['files'][name] for name in previous_group['files']})
+            return
+
+        names = []
+        for name, data in render():
+            content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+            digest = hashlib.sha256(content).hexdigest()
+
+            if self.force or previous['files'].get(name) != digest or not os.path.exists(self._path(name)):
+                _write_atomic(self._path(name), content)
+                self.written += 1
+            self.files[name] = digest
+            names.append(name)
+
+        self.groups[group] = {'source': source, 'files': names}
+
+    def finish(self):
+        """Remove files no group produced anymore and save the manifest if anything changed"""
+        previous = self.previous or {'version': 0, 'groups': {}, 'files': {}}
+        for name in previous['files'].keys() - self.files.keys():
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+            self.removed += 1
+
+        changed = self.previous is None or self.written or self.removed or previous['groups'] != self.groups
+        if not changed:
+            self.version = previous['version']
+            return self.version
+
+        manifest = {
+            'version': previous['version'] + 1,
+            'generated_at': timezone.now().isoformat(),
+            'groups': self.groups,
+            'files': self.files,
+        }
+        _write_atomic(self._path(MANIFEST_NAME), json.dumps(manifest, indent=2).encode())
+        self.version = manifest['version']
+        return self.version
+
+
+def register_static_export(exporter):
+    """Add `exporter(export)` to the static export, it exports its groups with `export.export_group`"""
+    if exporter not in EXPORTERS:
+        EXPORTERS.append(exporter)
+
+
+def export_static_site(root=None, force=False):
+    """Export the groups of every registered app, returns the export with its counters"""
+    export = StaticSiteExport(root=root, force=force)
+    for exporter in EXPORTERS:
+        exporter(export)
+    export.finish()
+    return export
+
+
+@shared_task
+def export_static_site_task(force=False):
+    """Periodic task to bring the static export up to date with the db"""
+    if not cache.add(EXPORT_LOCK_KEY, 1, EXPORT_LOCK_TIMEOUT):
+        return
+
+    try:
+        export = export_static_site(force=force)
+        if export.written or export.removed:
+            logger.info(f"Static export v{export.version}: {export.written} written, {export.removed} removed")
+    finally:
+        cache.delete(EXPORT_LOCK_KEY)
@@ -0,0 +1,31 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+STREAM_BATCH_SIZE = 50
+
+
+def _next_batch(iterator, size):
+    return list(islice(iterator, size))
+
+
+def _close(iterator):
+    close = getattr(iterator, 'close', None)
+    if close is not None:
+        close()
+
+
+async def iterate_in_thread(iterable, batch_size=STREAM_BATCH_SIZE):
+    """
+    Async iterator over a sync one, for a StreamingHttpResponse under ASGI.
+    Items are pulled `batch_size` at a time in the thread sync code runs in,
+    so the queries of the generator stay off the event loop and a response is
+    not buffered whole. A client leaving early closes the generator there too.
+    """
+    iterator = iter(iterable)
+    try:
+        while batch := await sync_to_async(_next_batch)(iterator, batch_size):
+            for item in batch:
+                yield item
+    finally:
+        await sync_to_async(_close)(iterator)
@@ -0,0 +1,17 @@
+from functools import partial
+
+from django.db import transaction
+
+
+def on_commit_once(func, *args, using=None):
+    """
+    Run `func(*args)` after the current transaction commits, skipping the
+    registration if the same call is already queued on this connection.
+    Outside of an atomic block the call runs immediately.
+    """
+    connection = transaction.get_connection(using)
+    for _, queued, _ in connection.run_on_commit:
+        if getattr(queued, 'func', None) is func and queued.args == args:
+            return
+
+    transaction.on_commit(partial(func, *args), using=using)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from base.helpers.static_export import export_static_site
+
+
+class Command(BaseCommand):
+    help = "Export the published blogs, projects, services, skills and experiences as static json files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help="Export directory, defaults to STATIC_EXPORT_ROOT")
+        parser.add_argument('--force', action='store_true', help="Render and rewrite every file")
+
+    def handle(self, *args, **options):
+        export = export_static_site(root=options['root'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Export v{export.version} in {export.root}: {export.written} written, {export.removed} removed"
+        ))
@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from base.helpers.image_variants import (
+    REGISTRY, generate_image_variants, generate_image_variants_task, variants_field_name
+)
+
+
+class Command(BaseCommand):
+    help = "Generate responsive variants for existing images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', help="Only process the given model label, e.g. blogs.Blog")
+        parser.add_argument('--force', action='store_true', help="Rebuild variants that are already up to date")
+        parser.add_argument('--sync', action='store_true', help="Process in this process instead of queueing celery tasks")
+
+    def handle(self, *args, **options):
+        labels = options['model'] or list(REGISTRY)
+        unknown = set(labels) - set(REGISTRY)
+        if unknown:
+            raise CommandError(f"No image variants registered for {', '.join(sorted(unknown))}")
+
+        total = 0
+        for label in labels:
+            model = apps.get_model(label)
+            for field_name in REGISTRY[label]:
+                queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f"{field_name}__isnull": True})
+                rows = queryset.values_list('pk', field_name, variants_field_name(field_name))
+
+                for pk, name, variants in rows.iterator():
+                    if not options['force'] and (variants or {}).get('source') == name:
+                        continue
+                    if options['sync']:
+                        generate_image_variants(label, pk, field_name, force=options['force'])
+                    else:
+                        generate_image_variants_task.delay(label, str(pk), field_name, options['force'])
+                    total += 1
+
+        action = "Processed" if options['sync'] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{action} {total} images"))
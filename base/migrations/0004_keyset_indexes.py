@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_client'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['-created_at', '-id'], name='base_client_created_9ac9da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitor',
+            index=models.Index(fields=['-last_visit', '-id'], name='base_visito_last_vi_ec09ab_idx'),
+        ),
+    ]
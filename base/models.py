@@ -35,6 +35,7 @@ class Visitor(models.Model):
         indexes = [
             models.Index(fields=['ip_address']),
             models.Index(fields=['first_visit']),
+            models.Index(fields=['-last_visit', '-id']),
         ]
 
     def __str__(self):
@@ -71,6 +72,9 @@ class Client(models.Model):
         verbose_name = 'Client'
         verbose_name_plural = 'Clients'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
         
     def __str__(self):
         return f"{self.name} ({self.email})"
@@ -0,0 +1,6 @@
+# Tasks live next to the helpers they belong to, importing them here lets
+# celery's autodiscovery register them in the worker and beat processes.
+from base.helpers.image_variants import generate_image_variants_task
+from base.helpers.static_export import export_static_site_task
+
+__all__ = ['generate_image_variants_task', 'export_static_site_task']
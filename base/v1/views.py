@@ -6,7 +6,7 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 
 # helpers
 from base.v1 import res_msg
-from base.helpers.pagination import CustomPagination
+from base.helpers.pagination import CustomPagination, CursorPaginationMixin
 from base.helpers.filters import VisitorFilter, ClientFilter
 from base.helpers.response import APIResponse
 
@@ -50,7 +50,7 @@ class CreateVisitor(generics.CreateAPIView):
         )
 
 
-class VisitorList(generics.ListAPIView):
+class VisitorList(CursorPaginationMixin, generics.ListAPIView):
     """API view to get visitor list"""
     RES_LANG = "en"
     serializer_class = VisitorSerializer
@@ -107,7 +107,7 @@ class CreateClient(generics.CreateAPIView):
         )
     
 
-class  ClientList(generics.ListAPIView):
+class  ClientList(CursorPaginationMixin, generics.ListAPIView):
     """API view to get client list"""
     RES_LANG = "en"
     serializer_class = ClientSerializer
@@ -1,20 +1,45 @@
 from django.contrib import admin
-from .models import Blog, Category, Tag
+from .models import Blog, Category, Tag, Comment, BlogRevision, BlogReadStats
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
     ordering = ['name']
-    list_display = ("name", "created_at",)
+    list_display = ("name", "published_count", "created_at",)
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     search_fields = ['name']
     ordering = ['name']
-    list_display = ("name", "created_at",)
+    list_display = ("name", "published_count", "created_at",)
 
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
     search_fields = ['title', 'type', 'body']
     ordering = ['created_at']
-    list_display = ("title", "category__name", "status", "created_at",)
+    list_display = ("title", "category__name", "status", "view_count", "unique_readers", "created_at",)
+    list_select_related = ("category",)
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    search_fields = ['author_name', 'author_email', 'content']
+    ordering = ['-created_at']
+    list_display = ("author_name", "blog", "is_approved", "created_at",)
+    list_filter = ("is_approved",)
+    list_select_related = ("blog",)
+
+@admin.register(BlogRevision)
+class BlogRevisionAdmin(admin.ModelAdmin):
+    ordering = ['blog', '-number']
+    list_display = ("blog", "number", "depth", "size", "created_at",)
+    list_select_related = ("blog",)
+    exclude = ("data",)
+    readonly_fields = ("blog", "number", "depth", "digest", "size",)
+
+@admin.register(BlogReadStats)
+class BlogReadStatsAdmin(admin.ModelAdmin):
+    search_fields = ['blog__title']
+    ordering = ['-day', '-views']
+    list_display = ("blog", "day", "views", "unique_readers",)
+    list_select_related = ("blog",)
+    date_hierarchy = "day"
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BlogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blogs'
+
+    def ready(self):
+        import blogs.signals  # noqa: F401
+        from base.helpers.static_export import register_static_export
+        from blogs.helpers.static_export import export_blogs
+
+        register_static_export(export_blogs)
@@ -0,0 +1,117 @@
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+
+from blogs.models import Blog
+from base.helpers.conditional import get_version
+
+FEEDS_SCOPE = 'blogs:feeds'
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_SIZE = 50
+SITEMAP_PAGE_SIZE = 50000  # the sitemap protocol limit per file
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def _attr(value):
+    return escape(value, {'"': '&quot;'})
+
+
+def blog_url(slug):
+    return f"{settings.SITE_URL}/blogs/{slug}"
+
+
+def published_blogs():
+    return Blog.objects.filter(status='published')
+
+
+def feed_cache_key(name):
+    return f"{FEEDS_SCOPE}:{get_version(FEEDS_SCOPE)}:{name}"
+
+
+def get_cached_feed(name):
+    return cache.get(feed_cache_key(name))
+
+
+def cached_stream(name, chunks):
+    """Yield the chunks and cache the whole document once the stream completes"""
+    key = feed_cache_key(name)
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), FEED_CACHE_TIMEOUT)
+
+
+def sitemap_pages():
+    """Number of sitemap files needed, more than one turns sitemap.xml into an index"""
+    count = published_blogs().count()
+    return max(1, -(-count // SITEMAP_PAGE_SIZE))
+
+
+def sitemap_index(pages, page_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for page in range(1, pages + 1):
+        yield f"<sitemap><loc>{escape(page_url(page))}</loc></sitemap>\n"
+    yield '</sitemapindex>\n'
+
+
+def sitemap_urls(page=1):
+    """Url entries of one sitemap page, straight from the rows without model instances"""
+    rows = published_blogs().order_by('-published_at', 'id').values_list('slug', 'updated_at')
+    rows = rows[(page - 1) * SITEMAP_PAGE_SIZE:page * SITEMAP_PAGE_SIZE]
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for slug, updated_at in rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+        yield f"<url><loc>{escape(blog_url(slug))}</loc><lastmod>{updated_at.isoformat()}</lastmod></url>\n"
+    yield '</urlset>\n'
+
+
+def _feed_rows():
+    rows = published_blogs().order_by('-published_at', '-id').values(
+        'title', 'slug', 'excerpt', 'published_at', 'updated_at', 'category__name'
+    )
+    return rows[:FEED_SIZE].iterator(chunk_size=FEED_SIZE)
+
+
+def rss_feed(feed_url):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>\n'
+    yield f"<title>{escape(settings.SITE_NAME)}</title><link>{escape(settings.SITE_URL)}</link>"
+    yield f"<description>{escape(settings.SITE_NAME)} blogs</description>"
+    yield f'<atom:link href="{_attr(feed_url)}" rel="self" type="application/rss+xml"/>\n'
+    for row in _feed_rows():
+        url = escape(blog_url(row['slug']))
+        yield (
+            f"<item><title>{escape(row['title'])}</title><link>{url}</link>"
+            f'<guid isPermaLink="true">{url}</guid>'
+            f"<description>{escape(row['excerpt'] or '')}</description>"
+            f"<category>{escape(row['category__name'] or '')}</category>"
+            f"<pubDate>{format_datetime(row['published_at'] or row['updated_at'])}</pubDate></item>\n"
+        )
+    yield '</channel></rss>\n'
+
+
+def atom_feed(feed_url):
+    updated = published_blogs().order_by('-updated_at').values_list('updated_at', flat=True).first()
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+    yield f"<title>{escape(settings.SITE_NAME)}</title><id>{escape(settings.SITE_URL)}/</id>"
+    yield f'<link href="{_attr(settings.SITE_URL)}"/><link href="{_attr(feed_url)}" rel="self"/>'
+    yield f"<author><name>{escape(settings.SITE_NAME)}</name></author>"
+    if updated:
+        yield f"<updated>{updated.isoformat()}</updated>\n"
+    for row in _feed_rows():
+        url = escape(blog_url(row['slug']))
+        yield (
+            f"<entry><title>{escape(row['title'])}</title><link href=\"{_attr(blog_url(row['slug']))}\"/><id>{url}</id>"
+            f"<published>{(row['published_at'] or row['updated_at']).isoformat()}</published>"
+            f"<updated>{row['updated_at'].isoformat()}</updated>"
+            f"<summary>{escape(row['excerpt'] or '')}</summary>"
+            f"<category term=\"{_attr(row['category__name'] or '')}\"/></entry>\n"
+        )
+    yield '</feed>\n'
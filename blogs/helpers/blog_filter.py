@@ -1,5 +1,10 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchHeadline
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import FilterSet, CharFilter, DateFromToRangeFilter
+from rest_framework.filters import BaseFilterBackend
 from blogs.models import Blog
+from blogs.helpers.blog_search import SEARCH_CONFIG
 
 class BlogFilter(FilterSet):
     """Filter for blogs with various options"""
@@ -10,4 +15,49 @@ class BlogFilter(FilterSet):
     class Meta:
         model = Blog
         fields = ['category', 'tag', 'published_from', 'status']
-        
\ No newline at end of file
+
+
+class TrendingOrderingFilter(BaseFilterBackend):
+    """
+    `?ordering=trending` lists the blogs of the trending snapshot in rank
+    order, a join on the small snapshot table instead of sorting every blog
+    """
+    ordering_param = 'ordering'
+    
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get(self.ordering_param) != 'trending':
+            return queryset
+        return queryset.filter(trending__isnull=False).order_by('trending__rank')
+
+
+class BlogSearchFilter(BaseFilterBackend):
+    """
+    Full text search over the blog search vector, including block content.
+    Results are ranked by relevance unless an explicit ordering is requested,
+    and carry a highlighted `search_highlight` snippet of the excerpt.
+    """
+    search_param = 'search'
+    ordering_param = 'ordering'
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+        
+        query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_highlight=SearchHeadline(
+                Coalesce('excerpt', 'subtitle', 'title'),
+                query,
+                config=SEARCH_CONFIG,
+                start_sel='<mark>',
+                stop_sel='</mark>',
+                max_words=35,
+                min_words=15,
+            ),
+        )
+        
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by('-search_rank', *queryset.query.order_by)
+        return queryset
@@ -0,0 +1,25 @@
+# Version scopes the cached blog list responses are tagged with, besides the
+# `blog:<id>`, `category:<id>` and `tag:<id>` scopes of what they contain.
+LIST_SCOPE = 'blogs:list'        # which blogs match and how they are ordered
+SEARCH_SCOPE = 'blogs:search'    # the indexed text of any blog
+TERMS_SCOPE = 'blogs:terms'      # category and tag names used as filters
+TRENDING_SCOPE = 'blogs:trending'  # the trending ranking snapshot
+
+TERM_FILTER_PARAMS = ('category', 'tag')
+
+
+def blog_list_tags(blogs, query_params):
+    """Scopes a list response depends on, `blogs` loaded with their tags"""
+    tags = [LIST_SCOPE]
+    if query_params.get('search'):
+        tags.append(SEARCH_SCOPE)
+    if any(query_params.get(param) for param in TERM_FILTER_PARAMS):
+        tags.append(TERMS_SCOPE)
+    if query_params.get('ordering') == 'trending':
+        tags.append(TRENDING_SCOPE)
+
+    for blog in blogs:
+        tags.append(f"blog:{blog.id}")
+        tags.append(f"category:{blog.category_id}")
+        tags.extend(f"tag:{tag.id}" for tag in blog.tags.all())
+    return tags
@@ -0,0 +1,634 @@
+import io
+import os
+import re
+import json
+import shlex
+import tarfile
+import logging
+import posixpath
+from time import monotonic
+from datetime import datetime, time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from celery import shared_task
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils.text import slugify
+
+from blogs.models import Blog, Category, Tag
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 50
+EXPORT_CHUNK_SIZE = 100
+IMPORT_REPORT_TIMEOUT = 60 * 60 * 24
+# an import task hands over to a new one after the batch passing this many seconds
+IMPORT_TASK_SECONDS = 4 * 60
+MEDIA_DIR = 'media'
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+FRONT_MATTER_FIELDS = ('title', 'slug', 'subtitle', 'status', 'category', 'tags', 'excerpt', 'published_at', 'featured_image')
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE = re.compile(r'^(`{3,}|~{3,})\s*(.*)$')
+IMAGE = re.compile(r'^!\[(?P<alt>[^\]]*)\]\((?P<path>\S+?)(?:\s+"(?P<caption>(?:[^"\\]|\\.)*)")?\)$')
+UNORDERED_ITEM = re.compile(r'^[-*+]\s+(.*)$')
+ORDERED_ITEM = re.compile(r'^\d+[.)]\s+(.*)$')
+QUOTE_SOURCE = re.compile(r'^(?:—|--)\s*(.+)$')
+
+
+# -------------
+# Markdown -> blocks
+# -------------
+def _scalar(value):
+    """Front matter values are plain text or json (quoted strings, lists)"""
+    value = value.strip()
+    if value[:1] in ('"', '['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def split_front_matter(text):
+    lines = text.lstrip('﻿').splitlines()
+    if not lines or lines[0].strip() != '---':
+        return {}, lines
+    for end, line in enumerate(lines[1:], start=1):
+        if line.strip() == '---':
+            break
+    else:
+        return {}, lines
+
+    meta = {}
+    for line in lines[1:end]:
+        key, sep, value = line.partition(':')
+        if sep and key.strip() in FRONT_MATTER_FIELDS:
+            meta[key.strip()] = _scalar(value)
+    return meta, lines[end + 1:]
+
+
+def _code_block(info, code):
+    """Fence info is `<language> caption="..." line_numbers=false`"""
+    try:
+        tokens = shlex.split(info)
+    except ValueError:
+        tokens = info.split()
+    options = dict(token.partition('=')[::2] for token in tokens[1:] if '=' in token)
+    content = {'code': code, 'language': tokens[0] if tokens else 'text'}
+    if options.get('caption'):
+        content['caption'] = options['caption']
+    if 'line_numbers' in options:
+        content['line_numbers'] = options['line_numbers'].lower() not in ('false', '0', 'no')
+    return content
+
+
+def parse_blocks(lines):
+    """Turn markdown lines into content block payloads as `ContentBlockSerializer` takes them"""
+    blocks = []
+    index = 0
+
+    def add(block_type, content):
+        blocks.append({'block_type': block_type, 'order': len(blocks), f"{block_type}_content": content})
+
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        if not stripped:
+            index += 1
+            continue
+
+        fence = FENCE.match(stripped)
+        if fence:
+            marker, code = fence.group(1), []
+            index += 1
+            while index < len(lines) and not (lines[index].strip().startswith(marker) and not lines[index].strip().strip(marker[0])):
+                code.append(lines[index])
+                index += 1
+            add('code', _code_block(fence.group(2), '\n'.join(code)))
+            index += 1
+            continue
+
+        heading = HEADING.match(stripped)
+        if heading:
+            add('heading', {'content': heading.group(2), 'level': min(len(heading.group(1)), 3)})
+            index += 1
+            continue
+
+        image = IMAGE.match(stripped)
+        if image:
+            caption = image.group('caption')
+            add('image', {
+                'image': image.group('path'),
+                'alt_text': image.group('alt') or None,
+                'caption': caption.replace('\\"', '"') if caption else None,
+            })
+            index += 1
+            continue
+
+        if stripped.startswith('>'):
+            quoted = []
+            while index < len(lines) and lines[index].strip().startswith('>'):
+                quoted.append(lines[index].strip()[1:].strip())
+                index += 1
+            source = QUOTE_SOURCE.match(quoted[-1]) if len(quoted) > 1 else None
+            if source:
+                quoted.pop()
+            add('quote', {'content': '\n'.join(quoted).strip(), 'source': source.group(1) if source else None})
+            continue
+
+        item_pattern = UNORDERED_ITEM if UNORDERED_ITEM.match(stripped) else ORDERED_ITEM if ORDERED_ITEM.match(stripped) else None
+        if item_pattern:
+            items = []
+            while index < len(lines):
+                current = lines[index]
+                item = item_pattern.match(current.strip())
+                if item and not current[:1].isspace():
+                    items.append(item.group(1))
+                elif current.strip() and current[:1].isspace() and items:
+                    # indented continuation of the previous item
+                    items[-1] += '\n' + current.strip()
+                else:
+                    break
+                index += 1
+            add('list', {
+                'list_type': 'unordered' if item_pattern is UNORDERED_ITEM else 'ordered',
+                'items': [{'content': content, 'order': order} for order, content in enumerate(items)],
+            })
+            continue
+
+        paragraph = []
+        while index < len(lines) and lines[index].strip() and not _starts_block(lines[index].strip()):
+            paragraph.append(lines[index].rstrip())
+            index += 1
+        add('text', {'content': '\n'.join(paragraph)})
+
+    return blocks
+
+
+def _starts_block(stripped):
+    return bool(
+        FENCE.match(stripped) or HEADING.match(stripped) or IMAGE.match(stripped) or stripped.startswith('>')
+        or UNORDERED_ITEM.match(stripped) or ORDERED_ITEM.match(stripped)
+    )
+
+
+def parse_markdown(entry):
+    """
+    Parse one `(name, text)` markdown file into `{'name', 'meta', 'blocks'}`,
+    or `{'name', 'error'}`. Runs in the import worker processes, so it only
+    deals with plain data and never touches the database.
+    """
+    name, text = entry
+    try:
+        meta, lines = split_front_matter(text)
+        blocks = parse_blocks(lines)
+        # without a title in the front matter the leading h1 is the title
+        if not meta.get('title') and blocks and blocks[0]['block_type'] == 'heading' and blocks[0]['heading_content']['level'] == 1:
+            meta['title'] = blocks.pop(0)['heading_content']['content']
+            for order, block in enumerate(blocks):
+                block['order'] = order
+        if not meta.get('title'):
+            return {'name': name, 'error': "missing title"}
+        if isinstance(meta.get('tags'), str):
+            meta['tags'] = [tag.strip() for tag in meta['tags'].split(',')]
+        return {'name': name, 'meta': meta, 'blocks': blocks}
+    except Exception as exc:
+        return {'name': name, 'error': f"unreadable markdown: {exc}"}
+
+
+# -------------
+# Import
+# -------------
+class MarkdownSource:
+    """A directory, a tarball or a single markdown file to import, read from disk or from `fileobj`"""
+
+    def __init__(self, path, fileobj=None):
+        self.path = str(path)
+        self.fileobj = fileobj
+        self.archive = None
+        self.members = None
+        if not self.path.lower().endswith(MARKDOWN_EXTENSIONS) and (fileobj is not None or os.path.isfile(self.path)):
+            self.archive = tarfile.open(fileobj=fileobj) if fileobj is not None else tarfile.open(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.archive is not None:
+            self.archive.close()
+
+    def entries(self):
+        """Yield `(name, text)` of every markdown file, one file in memory at a time"""
+        if self.archive is not None:
+            for member in self.archive:
+                if member.isfile() and member.name.lower().endswith(MARKDOWN_EXTENSIONS):
+                    text = self.archive.extractfile(member).read()
+                    yield posixpath.normpath(member.name), text.decode('utf-8', errors='replace')
+        elif self.fileobj is not None:
+            yield posixpath.basename(self.path), self.fileobj.read().decode('utf-8', errors='replace')
+        elif os.path.isfile(self.path):
+            with open(self.path, encoding='utf-8', errors='replace') as f:
+                yield os.path.basename(self.path), f.read()
+        else:
+            for directory, dirnames, filenames in os.walk(self.path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(MARKDOWN_EXTENSIONS):
+                        path = os.path.join(directory, filename)
+                        with open(path, encoding='utf-8', errors='replace') as f:
+                            yield os.path.relpath(path, self.path).replace(os.sep, '/'), f.read()
+
+    def read_file(self, markdown_name, reference):
+        """Content of a file referenced from a markdown file, None when it is not part of the source"""
+        if re.match(r'^[a-z][a-z0-9+.-]*:', reference, re.IGNORECASE):
+            return None
+        name = posixpath.normpath(posixpath.join(posixpath.dirname(markdown_name), reference.lstrip('/')))
+        if name.startswith('..'):
+            return None
+
+        if self.archive is not None:
+            if self.members is None:
+                self.members = {posixpath.normpath(member.name): member for member in self.archive.getmembers()}
+            member = self.members.get(name)
+            fileobj = self.archive.extractfile(member) if member is not None and member.isfile() else None
+            return fileobj.read() if fileobj is not None else None
+        if self.fileobj is not None:
+            # an uploaded markdown file comes without its media
+            return None
+
+        root = self.path if os.path.isdir(self.path) else os.path.dirname(self.path)
+        try:
+            with open(os.path.join(root, *name.split('/')), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+class ImportReport:
+    def __init__(self, processed=0, created=0, skipped=None, failed=None):
+        # markdown files of the source written so far, in their order
+        self.processed = processed
+        self.created = created
+        self.skipped = skipped or []
+        self.failed = failed or []
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('processed', 0), data.get('created', 0), data.get('skipped'), data.get('failed'))
+
+
+class TermResolver:
+    """Maps category and tag names to ids, creating the missing terms"""
+
+    def __init__(self, default_category=None):
+        self.categories = {name.lower(): pk for pk, name in Category.objects.values_list('id', 'name')}
+        self.tags = {name.lower(): pk for pk, name in Tag.objects.values_list('id', 'name')}
+        self.default_category = default_category
+
+    def category(self, name):
+        name = (name or self.default_category or '').strip()
+        if not name:
+            return None
+        if name.lower() not in self.categories:
+            self.categories[name.lower()] = Category.objects.create(name=name[:100]).id
+        return self.categories[name.lower()]
+
+    def tag_ids(self, names):
+        missing = {name.strip().lower(): name.strip() for name in names or [] if name and name.strip()}
+        missing = {key: name for key, name in missing.items() if key not in self.tags}
+        for key, tag in zip(missing, Tag.objects.bulk_create([Tag(name=name[:50]) for name in missing.values()])):
+            self.tags[key] = tag.id
+        return [self.tags[name.strip().lower()] for name in names or [] if name and name.strip()]
+
+
+def _upload(source, post, reference):
+    content = source.read_file(post['name'], reference)
+    if content is None:
+        return None
+    return SimpleUploadedFile(posixpath.basename(reference), content)
+
+
+def _blog_payload(source, post, terms):
+    """The `BlogCreateSerializer` data of a parsed post, with its files loaded from the source"""
+    meta = post['meta']
+    blocks = []
+    for block in post['blocks']:
+        if block['block_type'] == 'image':
+            image = _upload(source, post, block['image_content']['image'])
+            if image is None:
+                logger.warning(f"{post['name']}: image {block['image_content']['image']} not found, skipped")
+                continue
+            block = dict(block, image_content=dict(block['image_content'], image=image))
+        blocks.append(dict(block, order=len(blocks)))
+
+    data = {
+        'title': meta['title'],
+        'subtitle': meta.get('subtitle') or None,
+        'excerpt': meta.get('excerpt') or None,
+        'status': meta.get('status') or 'draft',
+        'category': terms.category(meta.get('category')),
+        'tags': terms.tag_ids(meta.get('tags')),
+        'content_blocks': blocks,
+    }
+    if meta.get('featured_image'):
+        data['featured_image'] = _upload(source, post, meta['featured_image'])
+    return data
+
+
+def post_slug(post):
+    stem = posixpath.splitext(posixpath.basename(post['name']))[0]
+    return (slugify(post['meta'].get('slug') or post['meta']['title']) or slugify(stem))[:280]
+
+
+def _published_at(value):
+    value = str(value or '')
+    try:
+        moment = parse_datetime(value)
+        if moment is None and (day := parse_date(value)):
+            moment = datetime.combine(day, time())
+    except ValueError:
+        return None
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def write_posts(source, posts, author, terms, report):
+    """Create a batch of parsed posts in one transaction, skipping existing slugs"""
+    # imported lazily, the serializers import the signals which import the helpers
+    from blogs.v1.serializers import BlogCreateSerializer
+
+    slugs = {post['name']: post_slug(post) for post in posts if 'meta' in post}
+    taken = set(Blog.objects.filter(slug__in=slugs.values()).values_list('slug', flat=True))
+
+    with transaction.atomic():
+        for post in posts:
+            if 'error' in post:
+                report.failed.append({'name': post['name'], 'errors': post['error']})
+                continue
+
+            slug = slugs[post['name']]
+            if slug in taken:
+                report.skipped.append({'name': post['name'], 'slug': slug})
+                continue
+
+            serializer = BlogCreateSerializer(data=_blog_payload(source, post, terms))
+            if not serializer.is_valid():
+                report.failed.append({'name': post['name'], 'errors': serializer.errors})
+                continue
+
+            published_at = None
+            if serializer.validated_data['status'] == 'published':
+                published_at = _published_at(post['meta'].get('published_at')) or timezone.now()
+            try:
+                blog = serializer.save(author=author, slug=slug, published_at=published_at)
+            except IntegrityError as exc:
+                report.failed.append({'name': post['name'], 'errors': str(exc)})
+                continue
+            taken.add(slug)
+            report.created += 1
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_markdown(source, author, report, default_category=None, workers=None, batch_size=IMPORT_BATCH_SIZE, deadline=None):
+    """
+    Import every markdown file of the source as a blog of `author`, counted in
+    the report. Files are parsed by a pool of `workers` processes (0 parses in
+    this process), a batch at a time, and every batch is written in one transaction.
+
+    The report of an earlier run resumes after the files it processed. Past the
+    `deadline` (a monotonic time) the import stops between two batches and
+    returns False, True once every file is processed.
+    """
+    terms = TermResolver(default_category)
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup) if workers != 0 else None
+    try:
+        for batch in _batches(islice(source.entries(), report.processed, None), batch_size):
+            posts = pool.map(parse_markdown, batch, chunksize=8) if pool else map(parse_markdown, batch)
+            write_posts(source, list(posts), author, terms, report)
+            report.processed += len(batch)
+            if deadline is not None and monotonic() >= deadline:
+                return False
+    finally:
+        if pool:
+            pool.shutdown()
+    return True
+
+
+def import_report_key(import_id):
+    return f"blog-import:{import_id}"
+
+
+@shared_task(soft_time_limit=IMPORT_TASK_SECONDS + 2 * 60, time_limit=IMPORT_TASK_SECONDS + 3 * 60)
+def import_markdown_task(import_id, upload_name, author_id, default_category=None):
+    """
+    Background import of an uploaded markdown file or tarball, the report is
+    kept in the cache. A long import runs as a chain of tasks, each resuming
+    after the files the report counts as processed.
+    """
+    from user.models import CustomUser
+
+    key = import_report_key(import_id)
+    report = ImportReport.from_dict(cache.get(key) or {})
+    cache.set(key, {'status': 'running', **report.as_dict()}, IMPORT_REPORT_TIMEOUT)
+    finished = False
+    try:
+        author = CustomUser.objects.get(pk=author_id)
+        with default_storage.open(upload_name, 'rb') as upload, MarkdownSource(upload_name, fileobj=upload) as source:
+            # celery workers are daemonic and can't fork a pool, parse in process
+            finished = import_markdown(
+                source, author, report, default_category=default_category, workers=0,
+                deadline=monotonic() + IMPORT_TASK_SECONDS,
+            )
+    except Exception as exc:
+        # the batches written before the error stay, the report says how far it got
+        finished = True
+        cache.set(key, {'status': 'failed', 'error': str(exc), **report.as_dict()}, IMPORT_REPORT_TIMEOUT)
+        raise
+    finally:
+        if finished:
+            default_storage.delete(upload_name)
+
+    if not finished:
+        cache.set(key, {'status': 'running', **report.as_dict()}, IMPORT_REPORT_TIMEOUT)
+        import_markdown_task.delay(import_id, upload_name, author_id, default_category)
+        return
+
+    cache.set(key, {'status': 'done', **report.as_dict()}, IMPORT_REPORT_TIMEOUT)
+    logger.info(f"Blog import {import_id}: {report.created} created, {len(report.skipped)} skipped, {len(report.failed)} failed")
+
+
+# -------------
+# Blog -> markdown
+# -------------
+def _front_matter_value(value):
+    if isinstance(value, list) or (isinstance(value, str) and (not value or value != value.strip() or '\n' in value or value[:1] in '"[')):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def media_name(storage_name):
+    """Path of a stored file inside an export, relative to the markdown files"""
+    return f"{MEDIA_DIR}/{storage_name}"
+
+
+def _fence(code):
+    longest = max((len(run) for run in re.findall(r'`{3,}', code)), default=2)
+    return '`' * (longest + 1)
+
+
+def _render_block(block):
+    relation = f"{block.block_type}_content"
+    content = getattr(block, relation, None)
+    if content is None:
+        return None
+
+    if block.block_type == 'text':
+        return content.content
+    if block.block_type == 'heading':
+        return f"{'#' * content.level} {content.content}"
+    if block.block_type == 'code':
+        info = [content.language or 'text']
+        if content.caption:
+            info.append(f"caption={shlex.quote(content.caption)}")
+        if not content.line_numbers:
+            info.append("line_numbers=false")
+        fence = _fence(content.code)
+        return f"{fence}{' '.join(info)}\n{content.code}\n{fence}"
+    if block.block_type == 'image':
+        if not content.image:
+            return None
+        caption = ' "' + content.caption.replace('"', '\\"') + '"' if content.caption else ''
+        return f"![{content.alt_text or ''}]({media_name(content.image.name)}{caption})"
+    if block.block_type == 'quote':
+        lines = [f"> {line}".rstrip() for line in content.content.splitlines()]
+        if content.source:
+            lines += [">", f"> — {content.source}"]
+        return '\n'.join(lines)
+    if block.block_type == 'list':
+        items = []
+        for number, item in enumerate(content.items.all(), start=1):
+            marker = '-' if content.list_type == 'unordered' else f"{number}."
+            first, *rest = item.content.splitlines() or ['']
+            items.append('\n'.join([f"{marker} {first}", *(f"   {line}" for line in rest)]))
+        return '\n'.join(items)
+    return None
+
+
+def render_markdown(blog):
+    """The markdown file of a blog loaded `with_document()`, and the storage names of its files"""
+    meta = {
+        'title': blog.title,
+        'slug': blog.slug,
+        'subtitle': blog.subtitle,
+        'status': blog.status,
+        'category': blog.category.name if blog.category_id else None,
+        'tags': [tag.name for tag in blog.tags.all()],
+        'excerpt': blog.excerpt,
+        'published_at': blog.published_at.isoformat() if blog.published_at else None,
+        'featured_image': media_name(blog.featured_image.name) if blog.featured_image else None,
+    }
+    front_matter = [f"{key}: {_front_matter_value(value)}" for key, value in meta.items() if value not in (None, '')]
+
+    files = [blog.featured_image.name] if blog.featured_image else []
+    body = []
+    for block in blog.content_blocks.all():
+        rendered = _render_block(block)
+        if rendered is not None:
+            body.append(rendered)
+        if block.block_type == 'image' and getattr(block, 'image_content', None) and block.image_content.image:
+            files.append(block.image_content.image.name)
+
+    return '\n'.join(['---', *front_matter, '---', '', '\n\n'.join(body), '']), files
+
+
+def iter_markdown_exports(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield `(file name, markdown, storage names of its files)` for every blog.
+    Blogs are loaded `chunk_size` at a time with their documents, so memory
+    stays flat whatever the number of blogs.
+    """
+    queryset = (queryset if queryset is not None else Blog.objects.all()).with_document().order_by('created_at', 'id')
+    for blog in queryset.iterator(chunk_size=chunk_size):
+        markdown, files = render_markdown(blog)
+        yield f"{blog.slug}.md", markdown, files
+
+
+def export_markdown(root, queryset=None):
+    """Write the markdown files and their media under a directory, returns the blog count"""
+    count = 0
+    for name, markdown, files in iter_markdown_exports(queryset):
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        for storage_name in files:
+            path = os.path.join(root, *media_name(storage_name).split('/'))
+            if os.path.exists(path) or not default_storage.exists(storage_name):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with default_storage.open(storage_name, 'rb') as source, open(path, 'wb') as target:
+                for chunk in source.chunks():
+                    target.write(chunk)
+        count += 1
+    return count
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only file whose written bytes are taken out by the streaming generator"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def stream_markdown_tarball(queryset=None):
+    """Yield a gzipped tarball of the markdown export chunk by chunk, for a streaming response"""
+    buffer = _StreamBuffer()
+    added = set()
+    with tarfile.open(fileobj=buffer, mode='w|gz') as archive:
+        for name, markdown, files in iter_markdown_exports(queryset):
+            content = markdown.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime = len(content), int(timezone.now().timestamp())
+            archive.addfile(info, io.BytesIO(content))
+
+            for storage_name in files:
+                if storage_name in added or not default_storage.exists(storage_name):
+                    continue
+                added.add(storage_name)
+                info = tarfile.TarInfo(media_name(storage_name))
+                info.size, info.mtime = default_storage.size(storage_name), int(timezone.now().timestamp())
+                with default_storage.open(storage_name, 'rb') as f:
+                    archive.addfile(info, f)
+            yield buffer.take()
+    yield buffer.take()
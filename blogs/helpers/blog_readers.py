@@ -0,0 +1,156 @@
+import re
+import hashlib
+import logging
+from datetime import timedelta
+from celery import shared_task
+from django.db.models import Case, When, Value, IntegerField, Sum
+from django.utils import timezone
+
+from blogs.models import Blog, BlogReadStats
+from blogs.helpers.blog_snapshot import schedule_snapshot_rebuild
+from base.helpers.conditional import bump_version
+from base.helpers.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# HyperLogLogs stay under 12kb whatever the number of readers they count
+READERS_KEY = "blogs:readers"
+DAY_VIEWS_KEY = "blogs:reads"
+ROLLUP_LOCK_KEY = "blogs:readers:rollup-lock"
+# day keys outlive their day long enough for a late rollup
+DAY_KEY_TTL = 60 * 60 * 24 * 3
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|preview|headless|curl|wget|python-requests', re.IGNORECASE)
+
+
+def reader_id(request):
+    """
+    Who reads: the `base.Visitor` id sent as `visitor_id` query param, header or
+    cookie, else the signed in user, else a hash of the ip and user agent.
+    None for crawlers, which aren't counted as readers.
+    """
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if BOT_PATTERN.search(user_agent):
+        return None
+
+    visitor_id = request.query_params.get('visitor_id') or request.headers.get('X-Visitor-Id') \
+        or request.COOKIES.get('visitor_id')
+    if visitor_id:
+        return f"visitor:{visitor_id[:64]}"
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    ip = forwarded.split(',')[0].strip() if forwarded else request.META.get('REMOTE_ADDR', '')
+    return "anon:" + hashlib.sha1(f"{ip}|{user_agent}".encode(), usedforsecurity=False).hexdigest()
+
+
+def _readers_key(blog_id, day=None):
+    return f"{READERS_KEY}:{day.isoformat()}:{blog_id}" if day else f"{READERS_KEY}:all:{blog_id}"
+
+
+def _day_views_key(day):
+    return f"{DAY_VIEWS_KEY}:{day.isoformat()}"
+
+
+def add_reader_view(pipe, blog_id, reader):
+    """Queue the view of one reader on a redis pipeline: the day's views, the day's and all time readers"""
+    blog_id, day = str(blog_id), timezone.now().date()
+    pipe.hincrby(_day_views_key(day), blog_id, 1)
+    pipe.expire(_day_views_key(day), DAY_KEY_TTL)
+    pipe.pfadd(_readers_key(blog_id, day), reader)
+    pipe.expire(_readers_key(blog_id, day), DAY_KEY_TTL)
+    pipe.pfadd(_readers_key(blog_id), reader)
+
+
+def rollup_read_stats(days=None):
+    """
+    Write the views and reader estimates of the given days (yesterday and
+    today by default) to BlogReadStats, and the all time estimates to the blogs.
+    Returns the number of rows written.
+    """
+    client = get_redis()
+    today = timezone.now().date()
+    days = days or [today - timedelta(days=1), today]
+
+    rows, blog_ids = [], set()
+    for day in days:
+        views = {blog_id.decode(): int(count) for blog_id, count in client.hgetall(_day_views_key(day)).items()}
+        if not views:
+            continue
+        pipe = client.pipeline(transaction=False)
+        for blog_id in views:
+            pipe.pfcount(_readers_key(blog_id, day))
+        readers = dict(zip(views, pipe.execute()))
+
+        existing = {str(pk) for pk in Blog.objects.filter(id__in=list(views)).values_list('id', flat=True)}
+        rows.extend(
+            BlogReadStats(blog_id=blog_id, day=day, views=views[blog_id], unique_readers=readers[blog_id])
+            for blog_id in views if blog_id in existing
+        )
+        blog_ids |= existing
+
+    if rows:
+        BlogReadStats.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['blog', 'day'], update_fields=['views', 'unique_readers'],
+        )
+
+    if blog_ids:
+        pipe = client.pipeline(transaction=False)
+        for blog_id in blog_ids:
+            pipe.pfcount(_readers_key(blog_id))
+        totals = dict(zip(blog_ids, pipe.execute()))
+        current = {str(pk): count for pk, count in Blog.objects.filter(id__in=blog_ids).values_list('id', 'unique_readers')}
+        changed = {blog_id: total for blog_id, total in totals.items() if current.get(blog_id, total) != total}
+        if changed:
+            Blog.objects.filter(id__in=changed).update(unique_readers=Case(
+                *[When(id=blog_id, then=Value(total)) for blog_id, total in changed.items()],
+                output_field=IntegerField(),
+            ))
+            # the count is part of the blog document
+            for blog_id in changed:
+                schedule_snapshot_rebuild(blog_id)
+                bump_version(f"blog:{blog_id}")
+    return len(rows)
+
+
+def drop_readers(blog_id):
+    """Free the all time readers log of a deleted blog"""
+    get_redis().delete(_readers_key(blog_id))
+
+
+def read_stats_report(date_from, date_to, limit=50):
+    """Per blog views, reader days and all time readers over a range of days, most viewed first"""
+    stats = BlogReadStats.objects.filter(day__range=(date_from, date_to))
+    daily = list(stats.values('day').annotate(views=Sum('views'), reader_days=Sum('unique_readers')).order_by('day'))
+    blogs = list(
+        stats.values('blog_id', 'blog__title', 'blog__unique_readers')
+        .annotate(views=Sum('views'), reader_days=Sum('unique_readers'))
+        .order_by('-views')[:limit]
+    )
+    return {
+        'from': date_from,
+        'to': date_to,
+        'days': daily,
+        'blogs': [
+            {
+                'id': row['blog_id'], 'title': row['blog__title'], 'views': row['views'],
+                # a reader coming back on another day counts once per day here
+                'reader_days': row['reader_days'], 'unique_readers': row['blog__unique_readers'],
+            }
+            for row in blogs
+        ],
+    }
+
+
+@shared_task
+def rollup_read_stats_task():
+    """Periodic task to store the daily views and reader estimates of the blogs"""
+    lock = get_redis().lock(ROLLUP_LOCK_KEY, timeout=300, blocking=False)
+    if not lock.acquire():
+        return
+
+    try:
+        rows = rollup_read_stats()
+        logger.info(f"Rolled up read stats of {rows} blog days")
+    finally:
+        lock.release()
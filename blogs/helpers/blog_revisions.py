@@ -0,0 +1,250 @@
+import json
+import zlib
+import difflib
+import hashlib
+import logging
+from celery import shared_task
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from blogs.models import Blog, BlogRevision, ContentBlock, Category, Tag
+from blogs.v1.serializers import ContentBlockSerializer
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+# a revision is rebuilt from its keyframe with at most KEYFRAME_INTERVAL - 1 deltas
+KEYFRAME_INTERVAL = 10
+COMPRESS_LEVEL = 9
+
+BLOG_FIELDS = ('title', 'subtitle', 'excerpt', 'status')
+CONTENT_FIELDS = {
+    'text': ('content',),
+    'heading': ('content', 'level'),
+    'code': ('code', 'language', 'caption', 'line_numbers'),
+    'image': ('image', 'caption', 'alt_text'),
+    'quote': ('content', 'source'),
+    'list': ('list_type',),
+}
+
+
+# -------------
+# Documents
+# -------------
+def _content_payload(block):
+    content = getattr(block, f"{block.block_type}_content", None)
+    if content is None:
+        return None
+
+    payload = {field: getattr(content, field) for field in CONTENT_FIELDS[block.block_type]}
+    if block.block_type == 'image':
+        payload['image'] = content.image.name or None
+    if block.block_type == 'list':
+        payload['items'] = [{'content': item.content, 'order': item.order} for item in content.items.all()]
+    return payload
+
+
+def revision_document(blog):
+    """
+    The editable state of a blog loaded `with_document()`, shaped like the
+    create api input. Derived data (counters, variants, highlighted html)
+    is left out, so only edits make a new revision.
+    """
+    document = {field: getattr(blog, field) for field in BLOG_FIELDS}
+    document.update({
+        'category': str(blog.category_id) if blog.category_id else None,
+        'tags': sorted(str(tag.id) for tag in blog.tags.all()),
+        'featured_image': blog.featured_image.name or None,
+        'published_at': blog.published_at.isoformat() if blog.published_at else None,
+        'content_blocks': [],
+    })
+    for block in blog.content_blocks.all():
+        payload = _content_payload(block)
+        entry = {'block_type': block.block_type, 'order': block.order}
+        if payload is not None:
+            entry[f"{block.block_type}_content"] = payload
+        document['content_blocks'].append(entry)
+    return document
+
+
+def document_lines(document):
+    # one scalar per line, so an edit only replaces the lines it touches
+    return json.dumps(document, cls=DjangoJSONEncoder, ensure_ascii=False, sort_keys=True, indent=1).splitlines()
+
+
+def _compress(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode(), COMPRESS_LEVEL)
+
+
+def _decompress(data):
+    return json.loads(zlib.decompress(bytes(data)).decode())
+
+
+def make_delta(previous, lines):
+    """Delta between two line lists, `[start, end]` copies previous lines and strings are new lines"""
+    delta = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, previous, lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            delta.extend(lines[j1:j2])
+    return delta
+
+
+def apply_delta(previous, delta):
+    lines = []
+    for op in delta:
+        if isinstance(op, list):
+            lines.extend(previous[op[0]:op[1]])
+        else:
+            lines.append(op)
+    return lines
+
+
+# -------------
+# History
+# -------------
+def revision_lines(blog_id, number):
+    """
+    Rebuild the document lines of a revision from its keyframe, one query and
+    at most KEYFRAME_INTERVAL - 1 delta applications. None when it doesn't exist.
+    """
+    chain = list(
+        BlogRevision.objects.filter(blog_id=blog_id, number__lte=number, number__gt=number - KEYFRAME_INTERVAL)
+        .order_by('-number').only('number', 'depth', 'data')
+    )
+    if not chain or chain[0].number != number:
+        return None
+
+    chain = chain[:chain[0].depth + 1][::-1]
+    lines = _decompress(chain[0].data)
+    for revision in chain[1:]:
+        lines = apply_delta(lines, _decompress(revision.data))
+    return lines
+
+
+def get_revision_document(blog_id, number):
+    lines = revision_lines(blog_id, number)
+    return json.loads('\n'.join(lines)) if lines is not None else None
+
+
+def record_revision(blog_id):
+    """
+    Store the current document of the blog as a new revision, unless it equals
+    the latest one. Returns the revision or None.
+    """
+    with transaction.atomic():
+        # revisions of a blog are numbered one at a time
+        if not Blog.objects.select_for_update().filter(id=blog_id).exists():
+            return None
+        blog = Blog.objects.with_document().get(id=blog_id)
+        lines = document_lines(revision_document(blog))
+        text = '\n'.join(lines)
+        digest = hashlib.sha256(text.encode()).hexdigest()
+
+        last = BlogRevision.objects.filter(blog_id=blog_id).order_by('-number').only('number', 'depth', 'digest').first()
+        if last is not None and last.digest == digest:
+            return None
+
+        data = _compress(lines)
+        depth = 0
+        if last is not None and last.depth + 1 < KEYFRAME_INTERVAL:
+            delta = _compress(make_delta(revision_lines(blog_id, last.number), lines))
+            # a delta bigger than the document itself is stored as a keyframe
+            if len(delta) < len(data):
+                data, depth = delta, last.depth + 1
+
+        return BlogRevision.objects.create(
+            blog_id=blog_id, number=last.number + 1 if last else 1, depth=depth,
+            data=data, digest=digest, size=len(text.encode()),
+        )
+
+
+def ensure_base_revision(blog_id):
+    """Record the current state of a blog without history, before its first tracked edit"""
+    if not BlogRevision.objects.filter(blog_id=blog_id).exists():
+        record_revision(blog_id)
+
+
+def _enqueue_revision(blog_id):
+    record_revision_task.delay(blog_id)
+
+
+def schedule_revision(blog_id):
+    """Queue a revision of the blog once the transaction commits"""
+    on_commit_once(_enqueue_revision, str(blog_id))
+
+
+@shared_task
+def record_revision_task(blog_id):
+    """Background task to store the blog's document as a revision"""
+    revision = record_revision(blog_id)
+    if revision is not None:
+        logger.info(f"Blog {blog_id} revision {revision.number} recorded ({'keyframe' if revision.is_keyframe else 'delta'})")
+
+
+# -------------
+# Restore and diff
+# -------------
+@transaction.atomic
+def restore_revision(blog, number):
+    """
+    Bring the blog back to a revision. The restored state is recorded as a new
+    revision, the history in between is kept. Returns False if it doesn't exist.
+    """
+    document = get_revision_document(blog.id, number)
+    if document is None:
+        return False
+
+    for field in BLOG_FIELDS:
+        setattr(blog, field, document[field])
+    if document['category'] and Category.objects.filter(id=document['category']).exists():
+        blog.category_id = document['category']
+    blog.featured_image = document['featured_image']
+    blog.published_at = parse_datetime(document['published_at']) if document['published_at'] else None
+    blog.save()
+    # tags deleted since then can't come back
+    blog.tags.set(Tag.objects.filter(id__in=document['tags']))
+
+    ContentBlock.objects.filter(blog=blog).delete()
+    blocks = [dict(block, blog=blog) for block in document['content_blocks']]
+    if blocks:
+        ContentBlockSerializer(many=True).create(blocks)
+    return True
+
+
+def _block_label(block):
+    return json.dumps(block, cls=DjangoJSONEncoder, sort_keys=True)
+
+
+def diff_revisions(blog_id, source, target):
+    """
+    Changes from revision `source` to `target`: changed fields with both values,
+    added and removed tags, and the block ranges that differ. None if either is missing.
+    """
+    before = get_revision_document(blog_id, source)
+    after = get_revision_document(blog_id, target)
+    if before is None or after is None:
+        return None
+
+    fields = {
+        field: {'from': before[field], 'to': after[field]}
+        for field in (*BLOG_FIELDS, 'category', 'featured_image', 'published_at')
+        if before[field] != after[field]
+    }
+    tags = {
+        'added': sorted(set(after['tags']) - set(before['tags'])),
+        'removed': sorted(set(before['tags']) - set(after['tags'])),
+    }
+
+    # blocks are compared without their position, a moved block isn't a change
+    old_blocks = [{k: v for k, v in block.items() if k != 'order'} for block in before['content_blocks']]
+    new_blocks = [{k: v for k, v in block.items() if k != 'order'} for block in after['content_blocks']]
+    matcher = difflib.SequenceMatcher(None, list(map(_block_label, old_blocks)), list(map(_block_label, new_blocks)), autojunk=False)
+    blocks = [
+        {'op': tag, 'from': [i1, i2], 'to': [j1, j2], 'removed': old_blocks[i1:i2], 'added': new_blocks[j1:j2]}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal'
+    ]
+
+    return {'source': source, 'target': target, 'fields': fields, 'tags': tags, 'blocks': blocks}
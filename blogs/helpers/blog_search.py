@@ -0,0 +1,84 @@
+import logging
+from celery import shared_task
+from django.contrib.postgres.search import SearchVector
+from django.db.models import Value, TextField
+
+from blogs.models import Blog
+from blogs.helpers.blog_list_cache import SEARCH_SCOPE
+from base.helpers.conditional import bump_version
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+
+
+def _block_text(block):
+    """Return the (weight, text) pairs of a single content block"""
+    content = getattr(block, f"{block.block_type}_content", None)
+    if content is None:
+        return []
+
+    if block.block_type == 'heading':
+        return [('B', content.content)]
+    if block.block_type == 'text':
+        return [('C', content.content)]
+    if block.block_type == 'quote':
+        return [('C', content.content), ('C', content.source)]
+    if block.block_type == 'image':
+        return [('C', content.caption), ('C', content.alt_text)]
+    if block.block_type == 'list':
+        return [('C', item.content) for item in content.items.all()]
+    if block.block_type == 'code':
+        return [('C', content.caption), ('D', content.code)]
+    return []
+
+
+def blog_search_document(blog):
+    """
+    Collect the weighted text of a blog loaded with `with_document()`:
+    A title, B subtitle/headings/tags, C excerpt/body/category, D code/author
+    """
+    parts = {
+        'A': [blog.title],
+        'B': [blog.subtitle] + [tag.name for tag in blog.tags.all()],
+        'C': [blog.excerpt, blog.category.name if blog.category_id else None],
+        'D': [blog.author.username],
+    }
+    for block in blog.content_blocks.all():
+        for weight, text in _block_text(block):
+            parts[weight].append(text)
+
+    return {weight: ' '.join(text for text in texts if text) for weight, texts in parts.items()}
+
+
+def update_search_vector(blog_id):
+    """Recompute the weighted search vector of one blog"""
+    blog = Blog.objects.with_document().filter(id=blog_id).first()
+    if blog is None:
+        return False
+
+    vector = None
+    for weight, text in blog_search_document(blog).items():
+        part = SearchVector(Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+
+    Blog.objects.filter(id=blog_id).update(search_vector=vector)
+    bump_version(SEARCH_SCOPE)
+    return True
+
+
+def _enqueue_search_vector_update(blog_id):
+    update_search_vector_task.delay(blog_id)
+
+
+def schedule_search_vector_update(blog_id):
+    """Queue a single search vector update for the blog once the transaction commits"""
+    on_commit_once(_enqueue_search_vector_update, str(blog_id))
+
+
+@shared_task
+def update_search_vector_task(blog_id):
+    """Background task to re-index a blog for full text search"""
+    if update_search_vector(blog_id):
+        logger.info(f"Search vector updated for blog ID {blog_id}")
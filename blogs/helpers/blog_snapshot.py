@@ -0,0 +1,119 @@
+import uuid
+import logging
+from celery import shared_task
+from django.core.cache import cache
+
+from blogs.models import Blog, BlogSnapshot
+from blogs.v1.serializers import BlogDetailSerializer
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def snapshot_cache_key(blog_id):
+    return f"blogs:snapshot:{blog_id}"
+
+
+def _normalize_blog_id(blog_id):
+    try:
+        return str(uuid.UUID(str(blog_id)))
+    except ValueError:
+        return None
+
+
+def build_blog_snapshot(blog_id):
+    """Render the blog document once and store it in the db and cache"""
+    try:
+        blog = Blog.objects.with_document().get(id=blog_id)
+    except Blog.DoesNotExist:
+        cache.delete(snapshot_cache_key(blog_id))
+        return None
+
+    # no request, media urls stay relative and are made absolute per request
+    document = BlogDetailSerializer(blog, context={'highlight': True}).data
+    BlogSnapshot.objects.update_or_create(blog=blog, defaults={'document': document})
+    cache.set(snapshot_cache_key(blog_id), document, SNAPSHOT_CACHE_TIMEOUT)
+    return document
+
+
+def _absolute_variants(variants, request):
+    if not variants:
+        return variants
+    return {
+        fmt: {width: request.build_absolute_uri(url) for width, url in urls.items()} if isinstance(urls, dict) else urls
+        for fmt, urls in variants.items()
+    }
+
+
+def absolute_media_urls(document, request):
+    """Blog document with the relative media urls of the snapshot made absolute for the request"""
+    def absolute(url):
+        return request.build_absolute_uri(url) if url else url
+
+    blocks = []
+    for block in document.get('content_blocks', []):
+        image = block.get('image_content')
+        if image:
+            block = dict(block, image_content=dict(
+                image, image=absolute(image.get('image')),
+                image_variants=_absolute_variants(image.get('image_variants'), request),
+            ))
+        blocks.append(block)
+    return dict(
+        document, content_blocks=blocks,
+        featured_image=absolute(document.get('featured_image')),
+        featured_image_variants=_absolute_variants(document.get('featured_image_variants'), request),
+    )
+
+
+def get_blog_snapshot(blog_id):
+    """
+    Return the rendered blog document from cache, falling back to the stored
+    snapshot and finally to a fresh build. Returns None if the blog doesn't exist.
+    """
+    blog_id = _normalize_blog_id(blog_id)
+    if blog_id is None:
+        return None
+
+    key = snapshot_cache_key(blog_id)
+    document = cache.get(key)
+    if document is not None:
+        return document
+
+    document = BlogSnapshot.objects.filter(blog_id=blog_id).values_list('document', flat=True).first()
+    if document is not None:
+        cache.set(key, document, SNAPSHOT_CACHE_TIMEOUT)
+        return document
+
+    return build_blog_snapshot(blog_id)
+
+
+def _enqueue_snapshot_rebuild(blog_id):
+    rebuild_blog_snapshot_task.delay(blog_id)
+
+
+def schedule_snapshot_rebuild(blog_id):
+    """Queue a single snapshot rebuild for the blog once the transaction commits"""
+    on_commit_once(_enqueue_snapshot_rebuild, str(blog_id))
+
+
+def _delete_cached_snapshot(blog_id):
+    cache.delete(snapshot_cache_key(blog_id))
+
+
+def drop_blog_snapshot(blog_id):
+    """Remove the cached document of a deleted blog once the transaction commits"""
+    on_commit_once(_delete_cached_snapshot, str(blog_id))
+
+
+@shared_task
+def rebuild_blog_snapshot_task(blog_id):
+    """Background task to re-render the blog document"""
+    document = build_blog_snapshot(blog_id)
+
+    if document is None:
+        logger.info(f"Blog {blog_id} no longer exists, snapshot dropped")
+    else:
+        logger.info(f"Blog snapshot rebuilt for ID {blog_id}")
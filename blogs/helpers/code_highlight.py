@@ -0,0 +1,95 @@
+import hashlib
+import logging
+from celery import shared_task
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name, TextLexer
+from pygments.util import ClassNotFound
+
+from blogs.models import CodeBlock
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_CSS_CLASS = 'highlight'
+HIGHLIGHT_QUERY_PARAM = 'highlight'
+
+
+def highlight_source_hash(code, language, line_numbers):
+    raw = f"{language}\0{int(bool(line_numbers))}\0{code}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def render_highlighted(code, language, line_numbers):
+    """
+    Highlighted html of the code with css classes, styled by any Pygments
+    stylesheet scoped to `.highlight`. Unknown languages render as plain text.
+    """
+    try:
+        lexer = get_lexer_by_name(language, stripnl=False)
+    except ClassNotFound:
+        lexer = TextLexer(stripnl=False)
+    formatter = HtmlFormatter(cssclass=HIGHLIGHT_CSS_CLASS, linenos='table' if line_numbers else False)
+    return highlight(code, lexer, formatter)
+
+
+def render_row(values):
+    """Process pool entry point, `(id, code, language, line_numbers)` to `(id, html, hash)`"""
+    pk, code, language, line_numbers = values
+    return pk, render_highlighted(code, language, line_numbers), highlight_source_hash(code, language, line_numbers)
+
+
+def needs_highlight(code_block):
+    return code_block.highlighted_hash != highlight_source_hash(
+        code_block.code, code_block.language, code_block.line_numbers
+    )
+
+
+def highlight_code_block(code_block_id):
+    """Render the html of a code block if its source changed, returns whether it did"""
+    code_block = CodeBlock.objects.filter(id=code_block_id).first()
+    if code_block is None or not needs_highlight(code_block):
+        return False
+
+    _, code_block.highlighted_html, code_block.highlighted_hash = render_row(
+        (code_block.id, code_block.code, code_block.language, code_block.line_numbers)
+    )
+    # a regular save, so the blog document picks up the html
+    code_block.save(update_fields=['highlighted_html', 'highlighted_hash'])
+    return True
+
+
+def _enqueue_highlight(code_block_id):
+    highlight_code_block_task.delay(code_block_id)
+
+
+def schedule_highlight(code_block):
+    """Queue the highlighting of a code block whose source changed, once the transaction commits"""
+    if needs_highlight(code_block):
+        on_commit_once(_enqueue_highlight, code_block.id)
+
+
+def wants_highlight(context):
+    """Whether a serializer should include the highlighted html"""
+    if context.get('highlight'):
+        return True
+    request = context.get('request')
+    return request is not None and request.query_params.get(HIGHLIGHT_QUERY_PARAM) in ('1', 'true')
+
+
+def strip_highlight(document):
+    """Blog document without the highlighted html of its code blocks"""
+    blocks = []
+    for block in document.get('content_blocks', []):
+        code = block.get('code_content')
+        if code and 'highlighted_html' in code:
+            block = dict(block, code_content={key: value for key, value in code.items() if key != 'highlighted_html'})
+        blocks.append(block)
+    return dict(document, content_blocks=blocks)
+
+
+@shared_task
+def highlight_code_block_task(code_block_id):
+    """Background task to render the highlighted html of a saved code block"""
+    if highlight_code_block(code_block_id):
+        logger.info(f"Code block {code_block_id} highlighted")
@@ -0,0 +1,91 @@
+import re
+import logging
+from celery import shared_task
+from django.core.mail import send_mail
+from django.db.models import OuterRef, Subquery, Count, Value
+from django.db.models.functions import Coalesce
+
+from blogs.models import Blog, Comment
+from blogs.helpers.blog_snapshot import schedule_snapshot_rebuild
+from base.helpers.conditional import bump_version
+from base.helpers.transaction import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+MAX_LINKS = 2
+LINK_PATTERN = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+def comments_scope(blog_id):
+    return f"comments:{blog_id}"
+
+
+def refresh_comment_count(blog_id):
+    """Recount the approved comments of the blog and refresh what shows the count"""
+    approved = Comment.objects.filter(is_approved=True, blog=OuterRef('pk')).order_by()
+    Blog.objects.filter(id=blog_id).update(comment_count=Coalesce(
+        Subquery(approved.values('blog').annotate(total=Count('pk')).values('total')), Value(0)
+    ))
+    schedule_snapshot_rebuild(blog_id)
+    bump_version('blogs', f"blog:{blog_id}", comments_scope(blog_id))
+
+
+def schedule_comment_count(blog_id):
+    """Recount the blog's comments once the transaction commits"""
+    on_commit_once(refresh_comment_count, str(blog_id))
+
+
+def _enqueue_moderation(comment_id):
+    moderate_comment_task.delay(comment_id)
+
+
+def schedule_moderation(comment_id):
+    """Queue the moderation of a submitted comment once the transaction commits"""
+    on_commit_once(_enqueue_moderation, str(comment_id))
+
+
+def moderation_issues(comment):
+    """Reasons to hold a comment for manual review, empty when it can be published"""
+    issues = []
+    if len(LINK_PATTERN.findall(comment.content)) > MAX_LINKS:
+        issues.append(f"more than {MAX_LINKS} links")
+
+    duplicate = Comment.objects.filter(
+        blog_id=comment.blog_id, author_email__iexact=comment.author_email, content=comment.content
+    ).exclude(id=comment.id)
+    if duplicate.exists():
+        issues.append("duplicate of an earlier comment")
+    return issues
+
+
+def notify_author(comment, issues):
+    author = comment.blog.author
+    if not author.email:
+        return
+
+    status = f"is held for review ({', '.join(issues)})" if issues else "has been published"
+    send_mail(
+        subject=f"New comment on {comment.blog.title}",
+        message=f"{comment.author_name} commented on \"{comment.blog.title}\", the comment {status}:\n\n{comment.content}",
+        from_email=None,
+        recipient_list=[author.email],
+        fail_silently=True,
+    )
+
+
+@shared_task
+def moderate_comment_task(comment_id):
+    """Background task to publish or hold a submitted comment and notify the blog author"""
+    comment = Comment.objects.select_related('blog__author').filter(id=comment_id).first()
+    if comment is None or comment.is_approved:
+        return
+
+    issues = moderation_issues(comment)
+    if not issues:
+        comment.is_approved = True
+        comment.save(update_fields=['is_approved', 'updated_at'])
+        logger.info(f"Comment {comment_id} approved")
+    else:
+        logger.info(f"Comment {comment_id} held for review: {', '.join(issues)}")
+
+    notify_author(comment, issues)
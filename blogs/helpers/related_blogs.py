@@ -0,0 +1,162 @@
+import math
+import logging
+from collections import defaultdict
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Q
+
+from blogs.models import Blog, RelatedBlog
+from base.helpers.transaction import on_commit_once
+from base.helpers.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+RELATED_LIMIT = 5
+CATEGORY_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_DAYS = 180
+
+# blogs whose neighbourhood changed, and blogs to recompute as they are
+PENDING_KEY = "blogs:related:pending"
+PENDING_EXACT_KEY = "blogs:related:pending-exact"
+SCHEDULED_KEY = "blogs:related:scheduled"
+LOCK_KEY = "blogs:related:lock"
+# changes within this many seconds are recomputed by a single task
+UPDATE_DELAY = 10
+
+
+class RelatedIndex:
+    """
+    Tag and category co-occurrence of the published blogs, loaded with two queries.
+    A shared tag weighs more the fewer blogs carry it, same category and close
+    publication dates add to the score of blogs that share a tag or the category.
+    """
+
+    def __init__(self):
+        published = Blog.objects.filter(status='published')
+        self.blogs = {
+            str(blog_id): (category_id, published_at)
+            for blog_id, category_id, published_at in published.values_list('id', 'category_id', 'published_at')
+        }
+        self.tags = defaultdict(set)
+        self.tag_blogs = defaultdict(set)
+        self.category_blogs = defaultdict(set)
+
+        for blog_id, tag_id in Blog.tags.through.objects.filter(blog__status='published').values_list('blog_id', 'tag_id'):
+            blog_id = str(blog_id)
+            self.tags[blog_id].add(tag_id)
+            self.tag_blogs[tag_id].add(blog_id)
+        for blog_id, (category_id, _) in self.blogs.items():
+            self.category_blogs[category_id].add(blog_id)
+
+    def score(self, blog_id, other_id):
+        category_id, published_at = self.blogs[blog_id]
+        other_category_id, other_published_at = self.blogs[other_id]
+
+        score = sum(1 / math.log(1 + len(self.tag_blogs[tag_id])) for tag_id in self.tags[blog_id] & self.tags[other_id])
+        if category_id == other_category_id:
+            score += CATEGORY_WEIGHT
+        if published_at and other_published_at:
+            days = abs((published_at - other_published_at).total_seconds()) / 86400
+            score += RECENCY_WEIGHT * 0.5 ** (days / RECENCY_HALF_LIFE_DAYS)
+        return score
+
+    def neighbours(self, blog_id, limit=RELATED_LIMIT):
+        """Top `limit` (score, blog id) pairs among blogs sharing a tag or the category"""
+        if blog_id not in self.blogs:
+            return []
+
+        candidates = set(self.category_blogs[self.blogs[blog_id][0]])
+        for tag_id in self.tags[blog_id]:
+            candidates |= self.tag_blogs[tag_id]
+        candidates.discard(blog_id)
+
+        scored = sorted(((self.score(blog_id, other_id), other_id) for other_id in candidates), reverse=True)
+        return scored[:limit]
+
+
+def affected_blog_ids(blog_id):
+    """The blog, the blogs listing it as related and the blogs it could now be related to"""
+    blog = Blog.objects.filter(id=blog_id).values('category_id').first()
+    condition = Q(id=blog_id) | Q(related_entries__related_id=blog_id)
+    if blog is not None:
+        condition |= Q(category_id=blog['category_id']) | Q(tags__blogs__id=blog_id)
+    return {str(affected_id) for affected_id in Blog.objects.filter(condition).values_list('id', flat=True).distinct()}
+
+
+def update_related_blogs(blog_ids=None):
+    """
+    Recompute the related blogs of the given blogs, or of every blog when None.
+    Runs one at a time, overlapping targets would insert the same ranks.
+    """
+    with get_redis().lock(LOCK_KEY, timeout=600, blocking_timeout=600):
+        index = RelatedIndex()
+        targets = set(index.blogs) if blog_ids is None else {str(blog_id) for blog_id in blog_ids}
+
+        entries = [
+            RelatedBlog(blog_id=blog_id, related_id=related_id, rank=rank, score=score)
+            for blog_id in targets
+            for rank, (score, related_id) in enumerate(index.neighbours(blog_id), start=1)
+        ]
+        with transaction.atomic():
+            stale = RelatedBlog.objects.all() if blog_ids is None else RelatedBlog.objects.filter(blog_id__in=targets)
+            stale.delete()
+            RelatedBlog.objects.bulk_create(entries)
+    return len(targets)
+
+
+def _queue_related_update(key, blog_ids):
+    client = get_redis()
+    client.sadd(key, *blog_ids)
+    # the first change schedules the task, the next ones join it
+    if client.set(SCHEDULED_KEY, 1, nx=True, ex=UPDATE_DELAY * 6):
+        update_related_blogs_task.apply_async(countdown=UPDATE_DELAY)
+
+
+def _take_pending(client, key):
+    pipe = client.pipeline()
+    pipe.smembers(key)
+    pipe.delete(key)
+    members, _deleted = pipe.execute()
+    return {member.decode() for member in members}
+
+
+def _enqueue_related_update(blog_id):
+    _queue_related_update(PENDING_KEY, [blog_id])
+
+
+def schedule_related_update(blog_id):
+    """Queue a related blogs update around the blog once the transaction commits"""
+    on_commit_once(_enqueue_related_update, str(blog_id))
+
+
+def _enqueue_related_refresh(blog_ids):
+    _queue_related_update(PENDING_EXACT_KEY, blog_ids)
+
+
+def schedule_related_refresh(blog_ids):
+    """Queue a recompute of exactly these blogs once the transaction commits"""
+    if blog_ids:
+        on_commit_once(_enqueue_related_refresh, sorted(str(blog_id) for blog_id in blog_ids))
+
+
+@shared_task
+def update_related_blogs_task(blog_id=None, blog_ids=None):
+    """Debounced task to refresh the related blogs around every blog changed since the last run"""
+    client = get_redis()
+    # tasks queued with arguments join the pending blogs
+    if blog_id is not None:
+        client.sadd(PENDING_KEY, str(blog_id))
+    if blog_ids:
+        client.sadd(PENDING_EXACT_KEY, *blog_ids)
+
+    # changes from now on schedule the next run
+    client.delete(SCHEDULED_KEY)
+    targets = _take_pending(client, PENDING_EXACT_KEY)
+    for changed_id in _take_pending(client, PENDING_KEY):
+        targets |= affected_blog_ids(changed_id)
+    if not targets:
+        return
+
+    total = update_related_blogs(targets)
+    logger.info(f"Related blogs recomputed for {total} blogs")
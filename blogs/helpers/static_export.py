@@ -0,0 +1,46 @@
+from base.helpers.conditional import get_versions
+from base.helpers.pagination import CustomPagination
+from blogs.models import Blog
+
+BLOG_PAGE_SIZE = CustomPagination.page_size
+
+
+def _blog_pages():
+    from blogs.v1.serializers import BlogListSerializer
+
+    queryset = Blog.objects.filter(status='published') \
+        .select_related('author', 'category').prefetch_related('tags') \
+        .defer('search_vector').order_by('-published_at', '-id')
+    results = BlogListSerializer(queryset, many=True).data
+
+    pages = max(1, -(-len(results) // BLOG_PAGE_SIZE))
+    for page in range(1, pages + 1):
+        yield f"blogs/page-{page}.json", {
+            'count': len(results),
+            'next': f"blogs/page-{page + 1}.json" if page < pages else None,
+            'previous': f"blogs/page-{page - 1}.json" if page > 1 else None,
+            'results': results[(page - 1) * BLOG_PAGE_SIZE:page * BLOG_PAGE_SIZE],
+        }
+
+
+def export_blogs(export):
+    """Export the pages of the blog list and the document of every published blog"""
+    # imported lazily, the serializers import the signals which import the helpers
+    from blogs.v1.serializers import BlogDetailSerializer
+
+    blog_ids = [str(blog_id) for blog_id in Blog.objects.filter(status='published').values_list('id', flat=True)]
+    versions = get_versions('blogs', *[f"blog:{blog_id}" for blog_id in blog_ids])
+
+    export.export_group('blogs', versions['blogs'], _blog_pages)
+
+    # changed blogs are rendered together, in the same few queries whatever their number
+    stale = [blog_id for blog_id in blog_ids if export.is_stale(f"blog:{blog_id}", versions[f"blog:{blog_id}"])]
+    documents = {
+        str(blog.id): BlogDetailSerializer(blog, context={'highlight': True}).data
+        for blog in Blog.objects.with_document().filter(id__in=stale, status='published')
+    }
+    for blog_id in blog_ids:
+        export.export_group(
+            f"blog:{blog_id}", versions[f"blog:{blog_id}"],
+            lambda blog_id=blog_id: [(f"blogs/{blog_id}.json", documents[blog_id])] if blog_id in documents else []
+        )
@@ -0,0 +1,36 @@
+from django.db.models import OuterRef, Subquery, Count, Value
+from django.db.models.functions import Coalesce
+
+from blogs.models import Blog, Category, Tag
+from base.helpers.conditional import bump_version
+from base.helpers.transaction import on_commit_once
+
+
+def _published_count(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def refresh_category_counts(*category_ids):
+    """Recount the published blogs of the categories in one update"""
+    Category.objects.filter(id__in=category_ids).update(
+        published_count=_published_count(Blog.objects.filter(status='published'), 'category')
+    )
+    bump_version('categories')
+
+
+def refresh_tag_counts(*tag_ids):
+    """Recount the published blogs of the tags in one update"""
+    Tag.objects.filter(id__in=tag_ids).update(
+        published_count=_published_count(Blog.tags.through.objects.filter(blog__status='published'), 'tag')
+    )
+    bump_version('tags')
+
+
+def schedule_term_counts(category_ids=(), tag_ids=()):
+    """Recount the terms once the transaction commits, each term at most once"""
+    for category_id in category_ids:
+        if category_id is not None:
+            on_commit_once(refresh_category_counts, str(category_id))
+    for tag_id in tag_ids:
+        on_commit_once(refresh_tag_counts, str(tag_id))
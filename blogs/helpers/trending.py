@@ -0,0 +1,117 @@
+import time
+import logging
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+
+from blogs.models import Blog, TrendingBlog
+from blogs.helpers.blog_list_cache import TRENDING_SCOPE
+from base.helpers.conditional import bump_version
+from base.helpers.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+TRENDING_KEY_PREFIX = "blogs:trending:gen"
+SNAPSHOT_LOCK_KEY = "blogs:trending:snapshot-lock"
+TRENDING_LIMIT = 20
+# views weigh 2^(age / half life) within a generation, which keeps scores
+# below 2^GENERATION_HALF_LIVES before they are folded into the next one
+GENERATION_HALF_LIVES = 32
+# scores that decayed below this are dropped when generations are folded
+MIN_SCORE = 2 ** -20
+
+
+def half_life():
+    return settings.TRENDING_HALF_LIFE_HOURS * 60 * 60
+
+
+def generation_of(timestamp):
+    return int(timestamp // (half_life() * GENERATION_HALF_LIVES))
+
+
+def generation_start(generation):
+    return generation * half_life() * GENERATION_HALF_LIVES
+
+
+def trending_key(generation):
+    return f"{TRENDING_KEY_PREFIX}:{generation}"
+
+
+def add_trending_view(pipe, blog_id, now=None):
+    """
+    Queue the score increment of one view on a redis pipeline. Instead of
+    decaying every score over time, later views weigh exponentially more, so
+    ranking the raw scores ranks the decayed ones.
+    """
+    now = now or time.time()
+    generation = generation_of(now)
+    weight = 2 ** ((now - generation_start(generation)) / half_life())
+    pipe.zincrby(trending_key(generation), weight, str(blog_id))
+
+
+def fold_generations(client, generation):
+    """Scale the scores of older generations into the current one and drop them"""
+    prefix = f"{TRENDING_KEY_PREFIX}:"
+    older = sorted(
+        int(key.decode()[len(prefix):]) for key in client.scan_iter(match=f"{prefix}*")
+        if int(key.decode()[len(prefix):]) < generation
+    )
+    if not older:
+        return
+
+    current = trending_key(generation)
+    keys = [current, *map(trending_key, older)]
+    weights = [1, *(2 ** (-GENERATION_HALF_LIVES * (generation - old)) for old in older)]
+    pipe = client.pipeline()
+    pipe.zunionstore(current, dict(zip(keys, weights)))
+    pipe.zremrangebyscore(current, '-inf', f"({MIN_SCORE}")
+    pipe.delete(*keys[1:])
+    pipe.execute()
+
+
+def snapshot_trending_blogs(now=None):
+    """
+    Store the top published blogs by decayed views as TrendingBlog rows.
+    Returns True when the ranking changed.
+    """
+    client = get_redis()
+    now = now or time.time()
+    generation = generation_of(now)
+    fold_generations(client, generation)
+
+    # over-fetch, drafts and deleted blogs may still hold scores
+    entries = client.zrevrange(trending_key(generation), 0, TRENDING_LIMIT * 3 - 1, withscores=True)
+    scores = {blog_id.decode(): score for blog_id, score in entries}
+    published = {
+        str(blog_id) for blog_id in
+        Blog.objects.filter(id__in=list(scores), status='published').values_list('id', flat=True)
+    }
+
+    decay = 2 ** (-(now - generation_start(generation)) / half_life())
+    top = [blog_id for blog_id in scores if blog_id in published][:TRENDING_LIMIT]
+
+    with transaction.atomic():
+        previous = [str(blog_id) for blog_id in TrendingBlog.objects.order_by('rank').values_list('blog_id', flat=True)]
+        TrendingBlog.objects.all().delete()
+        TrendingBlog.objects.bulk_create([
+            TrendingBlog(blog_id=blog_id, rank=rank, score=scores[blog_id] * decay)
+            for rank, blog_id in enumerate(top, start=1)
+        ])
+        changed = previous != top
+        if changed:
+            bump_version(TRENDING_SCOPE)
+    return changed
+
+
+@shared_task
+def snapshot_trending_blogs_task():
+    """Periodic task to refresh the trending blogs ranking from the view scores"""
+    lock = get_redis().lock(SNAPSHOT_LOCK_KEY, timeout=60, blocking=False)
+    if not lock.acquire():
+        return
+
+    try:
+        if snapshot_trending_blogs():
+            logger.info("Trending blogs ranking changed")
+    finally:
+        lock.release()
@@ -0,0 +1,90 @@
+import logging
+import redis
+from celery import shared_task
+from django.db.models import F, Case, When, Value, IntegerField
+
+from blogs.models import Blog
+from base.helpers.redis_client import get_redis
+from blogs.helpers.trending import add_trending_view
+from blogs.helpers.blog_readers import add_reader_view
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "blogs:views:pending"
+FLUSHING_KEY = "blogs:views:flushing"
+PERSISTED_KEY = "blogs:views:persisted"
+FLUSH_LOCK_KEY = "blogs:views:flush-lock"
+
+
+def record_view(blog_id, persisted_count=0, reader=None):
+    """
+    Buffer one view of the blog in redis and return its visible view count:
+    the last persisted count plus the views that are not flushed to the db yet.
+    `persisted_count` is used until the first flush has recorded the db value.
+    The view also feeds the trending scores and, given a `reader` id, the
+    reader estimates of the blog.
+    """
+    blog_id = str(blog_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hincrby(PENDING_KEY, blog_id, 1)
+        pipe.hget(FLUSHING_KEY, blog_id)
+        pipe.hget(PERSISTED_KEY, blog_id)
+        add_trending_view(pipe, blog_id)
+        if reader:
+            add_reader_view(pipe, blog_id, reader)
+        pending, flushing, persisted = pipe.execute()[:3]
+
+    except redis.RedisError as e:
+        logger.warning(f"View buffer unavailable, writing view of blog {blog_id} directly: {e}")
+        Blog.objects.filter(id=blog_id).update(view_count=F('view_count') + 1)
+        return persisted_count + 1
+
+    if persisted is not None:
+        persisted_count = int(persisted)
+    return persisted_count + pending + int(flushing or 0)
+
+
+@shared_task
+def flush_view_counts_task():
+    """Periodic task to write buffered views to the db in one bulk update"""
+    client = get_redis()
+    lock = client.lock(FLUSH_LOCK_KEY, timeout=60, blocking=False)
+    if not lock.acquire():
+        return
+
+    try:
+        # A batch left behind by a failed flush is retried before taking a new one
+        if not client.exists(FLUSHING_KEY):
+            try:
+                client.rename(PENDING_KEY, FLUSHING_KEY)
+            except redis.ResponseError:
+                return  # nothing buffered
+
+        counts = {
+            blog_id.decode(): int(views)
+            for blog_id, views in client.hgetall(FLUSHING_KEY).items()
+        }
+        persisted = {}
+        if counts:
+            Blog.objects.filter(id__in=counts).update(
+                view_count=F('view_count') + Case(
+                    *[When(id=blog_id, then=Value(views)) for blog_id, views in counts.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            persisted = {
+                str(blog_id): view_count
+                for blog_id, view_count in Blog.objects.filter(id__in=counts).values_list('id', 'view_count')
+            }
+
+        pipe = client.pipeline()
+        if persisted:
+            pipe.hset(PERSISTED_KEY, mapping=persisted)
+        pipe.delete(FLUSHING_KEY)
+        pipe.execute()
+        logger.info(f"Flushed buffered views of {len(counts)} blogs")
+
+    finally:
+        lock.release()
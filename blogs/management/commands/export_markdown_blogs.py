@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from blogs.models import Blog
+from blogs.helpers.blog_markdown import export_markdown, stream_markdown_tarball
+
+
+class Command(BaseCommand):
+    help = "Export the blogs as markdown files with their media, to a directory or a .tar.gz"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Directory, or a path ending in .tar.gz / .tgz")
+        parser.add_argument('--status', choices=[choice for choice, _ in Blog.STATUS_CHOICES], help="Only export blogs with this status")
+
+    def handle(self, *args, **options):
+        queryset = Blog.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        output = options['output']
+        if output.endswith(('.tar.gz', '.tgz')):
+            with open(output, 'wb') as f:
+                for chunk in stream_markdown_tarball(queryset):
+                    f.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f"Exported blogs to {output}"))
+            return
+
+        os.makedirs(output, exist_ok=True)
+        count = export_markdown(output, queryset)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} blogs to {output}"))
@@ -0,0 +1,42 @@
+import django
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from blogs.models import CodeBlock
+from blogs.helpers.code_highlight import render_row, highlight_source_hash
+from blogs.signals import blog_body_changed
+
+
+class Command(BaseCommand):
+    help = "Render the highlighted html of existing code blocks with a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Render blocks whose html is up to date too")
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes, defaults to the cpu count")
+        parser.add_argument('--batch-size', type=int, default=200, help="Blocks written per bulk update")
+
+    def handle(self, *args, **options):
+        rows = CodeBlock.objects.values_list('id', 'code', 'language', 'line_numbers', 'highlighted_hash', 'block__blog_id')
+        pending, blog_ids = [], {}
+        for pk, code, language, line_numbers, current_hash, blog_id in rows.iterator():
+            if options['force'] or current_hash != highlight_source_hash(code, language, line_numbers):
+                pending.append((pk, code, language, line_numbers))
+                blog_ids[pk] = blog_id
+
+        batch, changed_blogs = [], set()
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            for pk, html, source_hash in pool.map(render_row, pending, chunksize=32):
+                batch.append(CodeBlock(id=pk, highlighted_html=html, highlighted_hash=source_hash))
+                changed_blogs.add(blog_ids[pk])
+                if len(batch) >= options['batch_size']:
+                    CodeBlock.objects.bulk_update(batch, ['highlighted_html', 'highlighted_hash'])
+                    batch = []
+        if batch:
+            CodeBlock.objects.bulk_update(batch, ['highlighted_html', 'highlighted_hash'])
+
+        # bulk updates skip the signals, refresh the documents of the touched blogs
+        for blog_id in changed_blogs:
+            blog_body_changed(blog_id)
+
+        self.stdout.write(self.style.SUCCESS(f"Highlighted {len(pending)} code blocks in {len(changed_blogs)} blogs"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user.models import CustomUser
+from blogs.helpers.blog_markdown import MarkdownSource, ImportReport, import_markdown, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Import a directory, tarball or single file of markdown posts as blogs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Directory, .tar/.tar.gz archive or .md file")
+        parser.add_argument('--author', required=True, help="Username of the blogs' author")
+        parser.add_argument('--category', help="Category of posts without one in their front matter")
+        parser.add_argument('--workers', type=int, default=None, help="Parser processes, defaults to the cpu count, 0 parses in process")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Posts written per transaction")
+
+    def handle(self, *args, **options):
+        author = CustomUser.objects.filter(username=options['author']).first()
+        if author is None:
+            raise CommandError(f"User {options['author']} not found")
+
+        report = ImportReport()
+        with MarkdownSource(options['source']) as source:
+            import_markdown(
+                source, author, report, default_category=options['category'],
+                workers=options['workers'], batch_size=options['batch_size'],
+            )
+
+        for skipped in report.skipped:
+            self.stdout.write(f"Skipped {skipped['name']}: slug {skipped['slug']} exists")
+        for failed in report.failed:
+            self.stderr.write(f"Failed {failed['name']}: {failed['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.created} blogs, {len(report.skipped)} skipped, {len(report.failed)} failed"
+        ))
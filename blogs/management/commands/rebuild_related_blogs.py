@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blogs.helpers.related_blogs import update_related_blogs
+
+
+class Command(BaseCommand):
+    help = "Recompute the related blogs index of every published blog"
+
+    def handle(self, *args, **options):
+        total = update_related_blogs()
+        self.stdout.write(self.style.SUCCESS(f"Related blogs computed for {total} blogs"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blogs.models import Blog
+from blogs.helpers.blog_search import update_search_vector
+
+
+class Command(BaseCommand):
+    help = "Recompute the full text search vector of blogs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help="Only index blogs without a search vector")
+
+    def handle(self, *args, **options):
+        queryset = Blog.objects.all()
+        if options['missing']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        total = 0
+        for blog_id in queryset.values_list('id', flat=True).iterator():
+            update_search_vector(blog_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} blogs"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blogs.models import Blog
+from blogs.helpers.blog_revisions import record_revision
+
+
+class Command(BaseCommand):
+    help = "Record a revision of every blog whose current document isn't stored yet"
+
+    def handle(self, *args, **options):
+        recorded = sum(record_revision(blog_id) is not None for blog_id in Blog.objects.values_list('id', flat=True).iterator())
+        self.stdout.write(self.style.SUCCESS(f"Recorded {recorded} blog revisions"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 14:55
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0002_blog_category_codeblock_comment_contentblock_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogSnapshot',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='blogs.blog')),
+                ('document', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Blog Snapshot',
+                'verbose_name_plural': 'Blog Snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedBlog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('blog', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='blogs.blog')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='blogs.blog')),
+            ],
+            options={
+                'verbose_name': 'Related Blog',
+                'verbose_name_plural': 'Related Blogs',
+                'ordering': ['blog', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('blog', 'rank'), name='unique_related_blog_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 15:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Count, Value
+from django.db.models.functions import Coalesce
+
+
+def count_published(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    Category = apps.get_model('blogs', 'Category')
+    Tag = apps.get_model('blogs', 'Tag')
+
+    published = Blog.objects.filter(status='published', category=OuterRef('pk')).order_by()
+    Category.objects.update(published_count=Coalesce(
+        Subquery(published.values('category').annotate(total=Count('pk')).values('total')), Value(0)
+    ))
+    tagged = Blog.tags.through.objects.filter(blog__status='published', tag=OuterRef('pk')).order_by()
+    Tag.objects.update(published_count=Coalesce(
+        Subquery(tagged.values('tag').annotate(total=Count('pk')).values('total')), Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0007_relatedblog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Published blogs in the category'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Published blogs with the tag'),
+        ),
+        migrations.RunPython(count_published, migrations.RunPython.noop),
+    ]
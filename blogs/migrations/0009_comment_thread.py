@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 15:15
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Count, Value
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Blog = apps.get_model('blogs', 'Blog')
+    Comment = apps.get_model('blogs', 'Comment')
+
+    approved = Comment.objects.filter(is_approved=True, blog=OuterRef('pk')).order_by()
+    Blog.objects.update(comment_count=Coalesce(
+        Subquery(approved.values('blog').annotate(total=Count('pk')).values('total')), Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0008_term_published_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Approved comments'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['blog', '-created_at', '-id'], name='comment_thread_idx'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0009_comment_thread'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codeblock',
+            name='highlighted_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='codeblock',
+            name='highlighted_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 15:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0010_code_highlight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('depth', models.PositiveSmallIntegerField(default=0, help_text='Deltas applied since the last keyframe')),
+                ('data', models.BinaryField(help_text='zlib compressed document or delta')),
+                ('digest', models.CharField(help_text='sha256 of the document', max_length=64)),
+                ('size', models.PositiveIntegerField(default=0, help_text='Uncompressed document size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blog', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='blogs.blog')),
+            ],
+            options={
+                'verbose_name': 'Blog Revision',
+                'verbose_name_plural': 'Blog Revisions',
+                'ordering': ['blog', '-number'],
+                'constraints': [models.UniqueConstraint(fields=('blog', 'number'), name='unique_blog_revision_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 15:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0011_blog_revisions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingBlog',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='blogs.blog')),
+                ('rank', models.PositiveSmallIntegerField(unique=True)),
+                ('score', models.FloatField(help_text='Views decayed to the snapshot time')),
+            ],
+            options={
+                'verbose_name': 'Trending Blog',
+                'verbose_name_plural': 'Trending Blogs',
+                'ordering': ['rank'],
+            },
+        ),
+    ]
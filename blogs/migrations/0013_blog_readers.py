@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0012_trending_blogs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='unique_readers',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Estimated distinct readers, all time'),
+        ),
+        migrations.CreateModel(
+            name='BlogReadStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_readers', models.PositiveIntegerField(default=0)),
+                ('blog', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='read_stats', to='blogs.blog')),
+            ],
+            options={
+                'verbose_name': 'Blog Read Stats',
+                'verbose_name_plural': 'Blog Read Stats',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='blogs_blogr_day_ae0a85_idx')],
+                'constraints': [models.UniqueConstraint(fields=('blog', 'day'), name='unique_blog_read_stats_day')],
+            },
+        ),
+    ]
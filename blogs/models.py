@@ -1,4 +1,7 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -9,6 +12,7 @@ class Category(models.Model):
     """Categories for organizing blogs"""
     id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, primary_key=True)
     name = models.CharField(max_length=100)
+    published_count = models.PositiveIntegerField(default=0, editable=False, help_text=_("Published blogs in the category"))
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -25,6 +29,7 @@ class Tag(models.Model):
     """Tags for blogs"""
     id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, primary_key=True)
     name = models.CharField(max_length=50)
+    published_count = models.PositiveIntegerField(default=0, editable=False, help_text=_("Published blogs with the tag"))
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -37,6 +42,17 @@ class Tag(models.Model):
         verbose_name_plural = _("Tags")
         ordering = ["name"]
 
+class BlogQuerySet(models.QuerySet):
+    def with_document(self):
+        """
+        Load the blogs together with author, category, tags and the full
+        content block tree in a fixed number of queries
+        """
+        return self.select_related('author', 'category').defer('search_vector').prefetch_related(
+            'tags',
+            models.Prefetch('content_blocks', queryset=ContentBlock.objects.with_content()),
+        )
+
 class Blog(models.Model):
     """Main blog model"""
     STATUS_CHOICES = (
@@ -56,13 +72,19 @@ class Blog(models.Model):
     # Meta
     excerpt = models.TextField(blank=True, null=True, help_text=_("Short description for SEO and previews"))
     featured_image = models.ImageField(upload_to='blog/featured_images/', blank=True, null=True)
+    featured_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     reading_time = models.PositiveIntegerField(default=0, help_text=_("Estimated reading time in minutes"))
     view_count = models.PositiveIntegerField(default=0)
+    unique_readers = models.PositiveIntegerField(default=0, editable=False, help_text=_("Estimated distinct readers, all time"))
+    comment_count = models.PositiveIntegerField(default=0, editable=False, help_text=_("Approved comments"))
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(blank=True, null=True)
     
+    objects = BlogQuerySet.as_manager()
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -75,6 +97,18 @@ class Blog(models.Model):
         verbose_name = _("Blog")
         verbose_name_plural = _("Blogs")
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            models.Index(fields=['-published_at', '-id']),
+        ]
+
+class ContentBlockQuerySet(models.QuerySet):
+    def with_content(self):
+        """
+        Join the typed content of every block into a single query and
+        prefetch list items with one more, whatever the block count
+        """
+        return self.select_related(*ContentBlock.CONTENT_RELATIONS).prefetch_related('list_content__items')
 
 class ContentBlock(models.Model):
     """Base model for all content blocks"""
@@ -86,6 +120,10 @@ class ContentBlock(models.Model):
         ('quote', _('Quote')),
         ('list', _('List')),
     )
+    CONTENT_RELATIONS = (
+        'text_content', 'heading_content', 'code_content',
+        'image_content', 'quote_content', 'list_content',
+    )
     
     id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, primary_key=True)
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='content_blocks')
@@ -95,6 +133,8 @@ class ContentBlock(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ContentBlockQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _("Content Block")
         verbose_name_plural = _("Content Blocks")
@@ -131,6 +171,10 @@ class CodeBlock(models.Model):
     caption = models.CharField(max_length=255, blank=True, null=True)
     line_numbers = models.BooleanField(default=True)
     
+    # Pygments html of the code, rebuilt in the background when the source changes
+    highlighted_html = models.TextField(blank=True, default='', editable=False)
+    highlighted_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    
     def __str__(self):
         return f"Code Block: {self.language}"
 
@@ -138,6 +182,7 @@ class ImageBlock(models.Model):
     """Model for images and diagrams"""
     block = models.OneToOneField(ContentBlock, on_delete=models.CASCADE, related_name='image_content')
     image = models.ImageField(upload_to='blog/content_images/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     caption = models.CharField(max_length=255, blank=True, null=True)
     alt_text = models.CharField(max_length=255, blank=True, null=True, help_text=_("Alternative text for accessibility"))
     
@@ -197,3 +242,110 @@ class Comment(models.Model):
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
         ordering = ["-created_at"]
+        indexes = [
+            # the public thread of a blog, walked by cursor
+            models.Index(
+                fields=['blog', '-created_at', '-id'],
+                condition=models.Q(is_approved=True),
+                name='comment_thread_idx',
+            ),
+        ]
+
+class BlogSnapshot(models.Model):
+    """Pre-rendered document of a blog served by the details api"""
+    blog = models.OneToOneField(Blog, on_delete=models.CASCADE, related_name='snapshot', primary_key=True)
+    document = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    
+    built_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Snapshot: {self.blog_id}"
+    
+    class Meta:
+        verbose_name = _("Blog Snapshot")
+        verbose_name_plural = _("Blog Snapshots")
+
+class RelatedBlog(models.Model):
+    """Precomputed top related blogs of a published blog, ordered by rank"""
+    # served by the (blog, rank) unique index
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='related_entries', db_index=False)
+    related = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='related_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    def __str__(self):
+        return f"{self.blog_id} -> {self.related_id} (#{self.rank})"
+    
+    class Meta:
+        verbose_name = _("Related Blog")
+        verbose_name_plural = _("Related Blogs")
+        ordering = ["blog", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'rank'], name='unique_related_blog_rank'),
+        ]
+
+class BlogRevision(models.Model):
+    """
+    Stored state of a blog's editable document. Keyframes hold the full
+    document, other revisions a delta against the previous one, `depth`
+    counting the deltas since the last keyframe.
+    """
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='revisions', db_index=False)
+    number = models.PositiveIntegerField()
+    depth = models.PositiveSmallIntegerField(default=0, help_text=_("Deltas applied since the last keyframe"))
+    data = models.BinaryField(help_text=_("zlib compressed document or delta"))
+    digest = models.CharField(max_length=64, help_text=_("sha256 of the document"))
+    size = models.PositiveIntegerField(default=0, help_text=_("Uncompressed document size in bytes"))
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    @property
+    def is_keyframe(self):
+        return self.depth == 0
+    
+    def __str__(self):
+        return f"{self.blog_id} r{self.number}"
+    
+    class Meta:
+        verbose_name = _("Blog Revision")
+        verbose_name_plural = _("Blog Revisions")
+        ordering = ["blog", "-number"]
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'number'], name='unique_blog_revision_number'),
+        ]
+
+class TrendingBlog(models.Model):
+    """Snapshot of the top blogs by time decayed views, ordered by rank"""
+    blog = models.OneToOneField(Blog, on_delete=models.CASCADE, related_name='trending', primary_key=True)
+    rank = models.PositiveSmallIntegerField(unique=True)
+    score = models.FloatField(help_text=_("Views decayed to the snapshot time"))
+    
+    def __str__(self):
+        return f"#{self.rank} {self.blog_id}"
+    
+    class Meta:
+        verbose_name = _("Trending Blog")
+        verbose_name_plural = _("Trending Blogs")
+        ordering = ["rank"]
+
+class BlogReadStats(models.Model):
+    """Views and estimated distinct readers of a blog on one day, rolled up from redis"""
+    # served by the (blog, day) unique index
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='read_stats', db_index=False)
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    unique_readers = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.blog_id} {self.day}"
+    
+    class Meta:
+        verbose_name = _("Blog Read Stats")
+        verbose_name_plural = _("Blog Read Stats")
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'day'], name='unique_blog_read_stats_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
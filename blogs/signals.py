@@ -0,0 +1,216 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from user.models import CustomUser
+from blogs.models import (
+    Blog, Category, Tag, ContentBlock, TextBlock, HeadingBlock,
+    CodeBlock, ImageBlock, QuoteBlock, ListBlock, ListItem, Comment
+)
+from blogs.helpers.blog_snapshot import schedule_snapshot_rebuild, drop_blog_snapshot
+from blogs.helpers.blog_search import schedule_search_vector_update
+from blogs.helpers.related_blogs import schedule_related_update, schedule_related_refresh
+from blogs.helpers.term_counts import schedule_term_counts
+from blogs.helpers.blog_list_cache import LIST_SCOPE, TERMS_SCOPE
+from blogs.helpers.comments import schedule_comment_count
+from blogs.helpers.blog_feeds import FEEDS_SCOPE
+from blogs.helpers.code_highlight import schedule_highlight
+from blogs.helpers.blog_revisions import schedule_revision
+from blogs.helpers.blog_readers import drop_readers
+from base.helpers.conditional import bump_version, track_versions
+from base.helpers.image_variants import register_image_variants
+from base.helpers.transaction import on_commit_once
+
+BLOCK_CONTENT_MODELS = (TextBlock, HeadingBlock, CodeBlock, ImageBlock, QuoteBlock, ListBlock)
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+RELATED_FIELDS = {'status', 'category', 'published_at'}
+# fields deciding which blog lists a blog appears in and where
+LISTED_FIELDS = {'status': 'status', 'category': 'category_id', 'title': 'title', 'published_at': 'published_at'}
+
+track_versions('categories', Category)
+track_versions('tags', Tag)
+
+register_image_variants(Blog, 'featured_image')
+register_image_variants(ImageBlock, 'image')
+
+
+def blog_body_changed(blog_id):
+    """Refresh what is derived from the body of the blog, the lists and feeds don't show it"""
+    schedule_snapshot_rebuild(blog_id)
+    schedule_search_vector_update(blog_id)
+    schedule_revision(blog_id)
+    bump_version(f"blog:{blog_id}")
+
+
+def blog_changed(blog_id):
+    """Refresh everything derived from the blog document, its lists and feeds included"""
+    blog_body_changed(blog_id)
+    bump_version('blogs', FEEDS_SCOPE)
+
+
+def _is_cached(instance, field_name):
+    return instance._meta.get_field(field_name).is_cached(instance)
+
+
+def blog_id_of_content(instance):
+    """Resolve the blog of a per-type block row, reusing the loaded block when available"""
+    if _is_cached(instance, 'block'):
+        return instance.block.blog_id
+    return ContentBlock.objects.filter(id=instance.block_id).values_list('blog_id', flat=True).first()
+
+
+def blog_id_of_list_item(instance):
+    """Resolve the blog of a list item, reusing the loaded list block when available"""
+    if _is_cached(instance, 'list_block') and _is_cached(instance.list_block, 'block'):
+        return instance.list_block.block.blog_id
+    return ContentBlock.objects.filter(list_content__id=instance.list_block_id).values_list('blog_id', flat=True).first()
+
+
+# -------------
+# Blog
+# -------------
+def blog_tag_ids(blog_id):
+    return Blog.tags.through.objects.filter(blog_id=blog_id).values_list('tag_id', flat=True)
+
+
+@receiver(pre_save, sender=Blog)
+def blog_saving(sender, instance, update_fields, **kwargs):
+    # remember the listed fields to tell what the save changes
+    if instance._state.adding or (update_fields is not None and not update_fields & LISTED_FIELDS.keys()):
+        return
+    instance._listed = Blog.objects.filter(id=instance.id).values(*LISTED_FIELDS.values()).first()
+
+
+@receiver(post_save, sender=Blog)
+def blog_saved(sender, instance, created, update_fields, **kwargs):
+    blog_changed(instance.id)
+    # only publication and category take part in the related blogs score
+    if update_fields is None or update_fields & RELATED_FIELDS:
+        schedule_related_update(instance.id)
+
+    previous = instance.__dict__.pop('_listed', None)
+    if not created and not previous:
+        return
+    previous = previous or {'status': None, 'category_id': None}
+    if created or any(getattr(instance, attr) != previous[attr] for attr in LISTED_FIELDS.values()):
+        bump_version(LIST_SCOPE)
+
+    published = instance.status == 'published'
+    if published != (previous['status'] == 'published'):
+        schedule_term_counts({instance.category_id, previous['category_id']}, [] if created else blog_tag_ids(instance.id))
+    elif published and instance.category_id != previous['category_id']:
+        schedule_term_counts({instance.category_id, previous['category_id']})
+
+
+@receiver(pre_delete, sender=Blog)
+def blog_deleting(sender, instance, **kwargs):
+    # the cascade drops the entries pointing at the blog, refill those lists
+    schedule_related_refresh(instance.related_to.values_list('blog_id', flat=True))
+    if instance.status == 'published':
+        schedule_term_counts([instance.category_id], blog_tag_ids(instance.id))
+
+
+@receiver(post_delete, sender=Blog)
+def blog_deleted(sender, instance, **kwargs):
+    drop_blog_snapshot(instance.id)
+    on_commit_once(drop_readers, str(instance.id))
+    bump_version('blogs', f"blog:{instance.id}", LIST_SCOPE, FEEDS_SCOPE)
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def blog_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse and instance.status == 'published':
+        schedule_term_counts(tag_ids=blog_tag_ids(instance.id))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    bump_version(LIST_SCOPE)
+    if not reverse:
+        blog_changed(instance.id)
+        schedule_related_update(instance.id)
+        if pk_set and instance.status == 'published':
+            schedule_term_counts(tag_ids=pk_set)
+        return
+
+    schedule_term_counts(tag_ids=[instance.id])
+
+    # tag side of the relation, pk_set holds blog ids (None on clear)
+    blog_ids = pk_set if pk_set is not None else instance.blogs.values_list('id', flat=True)
+    for blog_id in blog_ids:
+        blog_changed(blog_id)
+        schedule_related_update(blog_id)
+
+
+def term_scope(instance):
+    return f"{instance._meta.model_name}:{instance.id}"
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def term_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    # the name shows in the lists containing the term and may be filtered on
+    bump_version(term_scope(instance), TERMS_SCOPE)
+    for blog_id in instance.blogs.values_list('id', flat=True):
+        blog_changed(blog_id)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def term_deleted(sender, instance, **kwargs):
+    # deleting a tag drops its blog links without m2m signals
+    bump_version(term_scope(instance), TERMS_SCOPE)
+
+
+@receiver(post_save, sender=CustomUser)
+def author_saved(sender, instance, created, update_fields, **kwargs):
+    # only the author's display fields are part of the blog document
+    if created or (update_fields is not None and not update_fields & AUTHOR_FIELDS):
+        return
+    for blog_id in Blog.objects.filter(author=instance).values_list('id', flat=True):
+        blog_changed(blog_id)
+
+
+# -------------
+# Content blocks
+# -------------
+@receiver(post_save, sender=ContentBlock)
+@receiver(post_delete, sender=ContentBlock)
+def content_block_changed(sender, instance, **kwargs):
+    blog_body_changed(instance.blog_id)
+
+
+def block_content_changed(sender, instance, **kwargs):
+    blog_id = blog_id_of_content(instance)
+    if blog_id:
+        blog_body_changed(blog_id)
+
+
+for block_model in BLOCK_CONTENT_MODELS:
+    post_save.connect(block_content_changed, sender=block_model)
+    post_delete.connect(block_content_changed, sender=block_model)
+
+
+@receiver(post_save, sender=CodeBlock)
+def code_block_saved(sender, instance, **kwargs):
+    schedule_highlight(instance)
+
+
+@receiver(post_save, sender=ListItem)
+@receiver(post_delete, sender=ListItem)
+def list_item_changed(sender, instance, **kwargs):
+    blog_id = blog_id_of_list_item(instance)
+    if blog_id:
+        blog_body_changed(blog_id)
+
+
+# -------------
+# Comments
+# -------------
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    # submissions wait for moderation and don't change the count yet
+    if kwargs.get('created') and not instance.is_approved:
+        return
+    schedule_comment_count(instance.blog_id)
@@ -0,0 +1,20 @@
+# Tasks live next to the helpers they belong to, importing them here lets
+# celery's autodiscovery register them in the worker and beat processes.
+from blogs.helpers.blog_snapshot import rebuild_blog_snapshot_task
+from blogs.helpers.blog_search import update_search_vector_task
+from blogs.helpers.view_counter import flush_view_counts_task
+from blogs.helpers.related_blogs import update_related_blogs_task
+from blogs.helpers.comments import moderate_comment_task
+from blogs.helpers.code_highlight import highlight_code_block_task
+from blogs.helpers.blog_markdown import import_markdown_task
+from blogs.helpers.blog_revisions import record_revision_task
+from blogs.helpers.trending import snapshot_trending_blogs_task
+from blogs.helpers.blog_readers import rollup_read_stats_task
+
+__all__ = [
+    'rebuild_blog_snapshot_task', 'update_search_vector_task',
+    'flush_view_counts_task', 'update_related_blogs_task',
+    'moderate_comment_task', 'highlight_code_block_task',
+    'import_markdown_task', 'record_revision_task',
+    'snapshot_trending_blogs_task', 'rollup_read_stats_task',
+]
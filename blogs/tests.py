@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+from user.models import CustomUser
+from blogs.models import (
+    Blog, Category, Tag, ContentBlock, TextBlock, HeadingBlock,
+    CodeBlock, ImageBlock, QuoteBlock, ListBlock, ListItem
+)
+from blogs.v1.serializers import BlogDetailSerializer
+
+# blogs with author and category, tags, blocks with their typed content, list items
+DOCUMENT_QUERIES = 4
+
+
+class BlogDocumentQueriesTest(TestCase):
+    """The blog document is loaded in the same number of queries whatever its block count"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create(username='author', email='author@example.com')
+        cls.category = Category.objects.create(name='Backend')
+        cls.tags = [Tag.objects.create(name='Django'), Tag.objects.create(name='Postgres')]
+
+    def create_blog(self, rounds):
+        blog = Blog.objects.create(title=f'Blog of {rounds}', author=self.author, category=self.category)
+        blog.tags.set(self.tags)
+
+        order = 0
+
+        def block(block_type):
+            nonlocal order
+            order += 1
+            return ContentBlock.objects.create(blog=blog, block_type=block_type, order=order)
+
+        # one block of every type per round
+        for index in range(rounds):
+            TextBlock.objects.create(block=block('text'), content=f'Text {index}')
+            HeadingBlock.objects.create(block=block('heading'), content=f'Heading {index}', level=2)
+            CodeBlock.objects.create(block=block('code'), code='print(1)', language='python')
+            ImageBlock.objects.create(block=block('image'), image='blog/content_images/diagram.png')
+            QuoteBlock.objects.create(block=block('quote'), content=f'Quote {index}')
+            list_block = ListBlock.objects.create(block=block('list'))
+            ListItem.objects.bulk_create([ListItem(list_block=list_block, content=f'Item {item}', order=item) for item in range(3)])
+        return blog
+
+    def serialize(self, blog_id):
+        return BlogDetailSerializer(Blog.objects.with_document().get(id=blog_id)).data
+
+    def test_single_block(self):
+        blog = Blog.objects.create(title='One block', author=self.author, category=self.category)
+        # a list block, without one the list items query is skipped
+        list_block = ListBlock.objects.create(block=ContentBlock.objects.create(blog=blog, block_type='list', order=1))
+        ListItem.objects.create(list_block=list_block, content='Item')
+
+        with self.assertNumQueries(DOCUMENT_QUERIES):
+            document = self.serialize(blog.id)
+        self.assertEqual(len(document['content_blocks']), 1)
+
+    def test_many_blocks(self):
+        for rounds in (1, 10):
+            blog = self.create_blog(rounds)
+            with self.assertNumQueries(DOCUMENT_QUERIES):
+                document = self.serialize(blog.id)
+            self.assertEqual(len(document['content_blocks']), rounds * 6)
+            self.assertEqual(len(document['content_blocks'][-1]['list_content']['items']), 3)
@@ -0,0 +1,11 @@
+from django.urls import path
+from .feeds import BlogSitemap, BlogRSSFeed, BlogAtomFeed
+
+app_name = 'feeds'
+
+urlpatterns = [
+    path("sitemap.xml", BlogSitemap.as_view(), name="sitemap"),
+    path("sitemap-<int:page>.xml", BlogSitemap.as_view(), name="sitemap-page"),
+    path("feeds/rss.xml", BlogRSSFeed.as_view(), name="rss"),
+    path("feeds/atom.xml", BlogAtomFeed.as_view(), name="atom"),
+]
@@ -0,0 +1,74 @@
+from abc import ABCMeta, abstractmethod
+from django.http import HttpResponse, StreamingHttpResponse, Http404
+from django.urls import reverse
+from django.views import View
+
+from blogs.helpers.blog_feeds import (
+    get_cached_feed, cached_stream, sitemap_pages, sitemap_index, sitemap_urls, rss_feed, atom_feed
+)
+from base.helpers.streaming import iterate_in_thread
+
+
+class CachedFeedView(View, metaclass=ABCMeta):
+    """
+    Serves an xml document from the cache, or streams it from the db while
+    caching it for the next requests. The cache is keyed on the feeds version,
+    bumped whenever a blog changes, and on the host the absolute urls point to.
+    """
+    content_type = 'application/xml; charset=utf-8'
+    cache_name = None
+
+    def get_cache_name(self):
+        return self.cache_name
+
+    @abstractmethod
+    def generate(self):
+        """Chunks of the document"""
+
+    def get(self, request, *args, **kwargs):
+        name = f"{self.get_cache_name()}:{request.scheme}://{request.get_host()}"
+        document = get_cached_feed(name)
+        if document is not None:
+            return HttpResponse(document, content_type=self.content_type)
+
+        chunks = iterate_in_thread(cached_stream(name, self.generate()))
+        return StreamingHttpResponse(chunks, content_type=self.content_type)
+
+
+class BlogSitemap(CachedFeedView):
+    """sitemap.xml of the published blogs, an index of sitemap pages past the per file limit"""
+
+    def get_cache_name(self):
+        return f"sitemap:{self.kwargs.get('page', 'root')}"
+
+    def generate(self):
+        pages = sitemap_pages()
+        page = self.kwargs.get('page')
+
+        if page is None:
+            if pages == 1:
+                return sitemap_urls(1)
+            page_url = lambda number: self.request.build_absolute_uri(reverse('feeds:sitemap-page', args=[number]))
+            return sitemap_index(pages, page_url)
+
+        if not 1 <= page <= pages:
+            raise Http404
+        return sitemap_urls(page)
+
+
+class BlogRSSFeed(CachedFeedView):
+    """RSS 2.0 feed of the latest published blogs"""
+    content_type = 'application/rss+xml; charset=utf-8'
+    cache_name = "rss"
+
+    def generate(self):
+        return rss_feed(self.request.build_absolute_uri())
+
+
+class BlogAtomFeed(CachedFeedView):
+    """Atom feed of the latest published blogs"""
+    content_type = 'application/atom+xml; charset=utf-8'
+    cache_name = "atom"
+
+    def generate(self):
+        return atom_feed(self.request.build_absolute_uri())
@@ -15,6 +15,10 @@ BLOG_UPDATED = {
     "en": "Blog has been updated!"
 }
 
+BLOG_BLOCKS_UPDATED = {
+    "en": "Blog content has been updated!"
+}
+
 BLOG_DELETED = {
     "en": "Blog has been deleted!"
 }
@@ -23,6 +27,50 @@ BLOG_NOT_FOUND = {
     "en": "Blog not found!"
 }
 
+RELATED_BLOG_LIST = {
+    "en": "Related blogs received!"
+}
+
+TRENDING_BLOG_LIST = {
+    "en": "Trending blogs received!"
+}
+
+BLOG_READ_REPORT = {
+    "en": "Blog read report received!"
+}
+
+BLOG_REVISION_LIST = {
+    "en": "Blog revisions received!"
+}
+
+BLOG_REVISION_DETAILS = {
+    "en": "Blog revision received!"
+}
+
+BLOG_REVISION_DIFF = {
+    "en": "Blog revision diff received!"
+}
+
+BLOG_REVISION_RESTORED = {
+    "en": "Blog has been restored to the revision!"
+}
+
+BLOG_REVISION_NOT_FOUND = {
+    "en": "Blog revision not found!"
+}
+
+BLOG_IMPORT_QUEUED = {
+    "en": "Blog import has been queued!"
+}
+
+BLOG_IMPORT_STATUS = {
+    "en": "Blog import status received!"
+}
+
+BLOG_IMPORT_NOT_FOUND = {
+    "en": "Blog import not found!"
+}
+
 # category
 CATEGORY_CREATED = {
     "en": "New Category Created!"
@@ -65,3 +113,13 @@ TAG_DELETED = {
 TAG_NOT_FOUND = {
     "en": "Tag not found!"
 }
+
+
+# comment
+COMMENT_RECEIVED = {
+    "en": "Comment received, it will appear after moderation!"
+}
+
+COMMENT_LIST = {
+    "en": "Comment List received!"
+}
@@ -1,9 +1,13 @@
 from django.db import transaction
+from django.db.models import Case, When, Value, IntegerField
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from base.helpers.image_variants import ImageVariantsField, schedule_image_variants
+from blogs.helpers.code_highlight import schedule_highlight, wants_highlight
 from blogs.models import (
     Blog, Category, Tag, ContentBlock, TextBlock, HeadingBlock, 
-    CodeBlock, ImageBlock, QuoteBlock, ListBlock, ListItem
+    CodeBlock, ImageBlock, QuoteBlock, ListBlock, ListItem, Comment, BlogRevision
 )
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -16,6 +20,16 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name']
 
+class CategoryListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name', 'published_count']
+
+class TagListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'published_count']
+
 
 # Serializers for content blocks
 class TextBlockSerializer(serializers.ModelSerializer):
@@ -31,12 +45,21 @@ class HeadingBlockSerializer(serializers.ModelSerializer):
 class CodeBlockSerializer(serializers.ModelSerializer):
     class Meta:
         model = CodeBlock
-        fields = ['code', 'language', 'caption', 'line_numbers']
+        fields = ['code', 'language', 'caption', 'line_numbers', 'highlighted_html']
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # pre-rendered html is only sent to clients asking for it
+        if not wants_highlight(self.context):
+            data.pop('highlighted_html', None)
+        return data
 
 class ImageBlockSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+    
     class Meta:
         model = ImageBlock
-        fields = ['image', 'caption', 'alt_text']
+        fields = ['image', 'image_variants', 'caption', 'alt_text']
 
 class QuoteBlockSerializer(serializers.ModelSerializer):
     class Meta:
@@ -62,6 +85,59 @@ class ListBlockSerializer(serializers.ModelSerializer):
             ListItem.objects.create(list_block=list_block, **item_data)
         return list_block
 
+class ContentBlockListSerializer(serializers.ListSerializer):
+    """
+    Creates many content blocks with one bulk insert per table: content blocks,
+    each per-type content table and list items, whatever the block count
+    """
+    
+    def create(self, validated_data):
+        blocks = []
+        contents = {relation: [] for relation in ContentBlock.CONTENT_RELATIONS}
+        
+        for block_data in validated_data:
+            block_data = dict(block_data)
+            payloads = {relation: block_data.pop(relation, None) for relation in ContentBlock.CONTENT_RELATIONS}
+            block = ContentBlock(**block_data)
+            blocks.append(block)
+            
+            # Only the content matching the block type is stored
+            relation = f"{block.block_type}_content"
+            if payloads.get(relation):
+                contents[relation].append((block, dict(payloads[relation])))
+        
+        ContentBlock.objects.bulk_create(blocks)
+        
+        list_items = []
+        for relation, entries in contents.items():
+            if not entries:
+                continue
+            
+            content_model = ContentBlock._meta.get_field(relation).related_model
+            rows = []
+            for block, payload in entries:
+                items_data = payload.pop('items', [])
+                row = content_model(block=block, **payload)
+                rows.append(row)
+                list_items.extend(ListItem(list_block=row, **item_data) for item_data in items_data)
+            
+            # pks are returned by the insert, so list items can reference them
+            content_model.objects.bulk_create(rows)
+            
+            # bulk inserts skip post_save, queue the background work explicitly
+            if content_model is ImageBlock:
+                for row in rows:
+                    schedule_image_variants(row, 'image')
+            elif content_model is CodeBlock:
+                for row in rows:
+                    schedule_highlight(row)
+        
+        if list_items:
+            ListItem.objects.bulk_create(list_items)
+        
+        return blocks
+
+
 # Serializer for content blocks with content type discrimination
 class ContentBlockSerializer(serializers.ModelSerializer):
     text_content = TextBlockSerializer(required=False)
@@ -78,6 +154,7 @@ class ContentBlockSerializer(serializers.ModelSerializer):
             'text_content', 'heading_content', 'code_content', 
             'image_content', 'quote_content', 'list_content'
         ]
+        list_serializer_class = ContentBlockListSerializer
     
     def create(self, validated_data):
         # Extract nested content data based on block type
@@ -140,20 +217,20 @@ class BlogCreateSerializer(serializers.ModelSerializer):
         tags_data = validated_data.pop('tags', [])
         content_blocks_data = validated_data.pop('content_blocks', [])
         
-        # Create the blog
-        blog = Blog.objects.create(
-            author=self.context['request'].user,
-            **validated_data
-        )
+        # Create the blog, imports pass their author to save()
+        if 'author' not in validated_data:
+            validated_data['author'] = self.context['request'].user
+        blog = Blog.objects.create(**validated_data)
 
         # Add tags
         if tags_data:
             blog.tags.set(tags_data)
 
-        # Create content blocks
+        # Create content blocks in bulk
         for block_data in content_blocks_data:
             block_data['blog'] = blog
-            self.fields['content_blocks'].child.create(block_data)
+        if content_blocks_data:
+            self.fields['content_blocks'].create(content_blocks_data)
 
         return blog
 
@@ -166,10 +243,7 @@ class ContentBlockDetailSerializer(ContentBlockSerializer):
     def to_representation(self, instance):
         data = super().to_representation(instance)
         # Only include the content for the specific block type
-        content_types = ['text_content', 'heading_content', 'code_content', 
-                         'image_content', 'quote_content', 'list_content']
-        
-        for content_type in content_types:
+        for content_type in ContentBlock.CONTENT_RELATIONS:
             if content_type != f"{instance.block_type}_content" and content_type in data:
                 data.pop(content_type)
         
@@ -180,13 +254,14 @@ class BlogDetailSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
     content_blocks = ContentBlockDetailSerializer(many=True, read_only=True)
+    featured_image_variants = ImageVariantsField()
     
     class Meta:
         model = Blog
         fields = [
             'id', 'title', 'slug', 'subtitle', 'author',
-            'status', 'excerpt', 'featured_image', 
-            'category', 'tags', 'reading_time', 'view_count',
+            'status', 'excerpt', 'featured_image', 'featured_image_variants',
+            'category', 'tags', 'reading_time', 'view_count', 'unique_readers', 'comment_count',
             'content_blocks', 'created_at', 'updated_at', 'published_at'
         ]
     
@@ -202,13 +277,16 @@ class BlogListSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    # Only present on search results
+    search_highlight = serializers.CharField(read_only=True)
+    featured_image_variants = ImageVariantsField()
     
     class Meta:
         model = Blog
         fields = [
-            'id', 'title', 'subtitle', 'slug', 'featured_image',
+            'id', 'title', 'subtitle', 'slug', 'featured_image', 'featured_image_variants',
             'author', 'category', 'tags', 'reading_time',
-            'view_count', 'published_at'
+            'view_count', 'comment_count', 'published_at', 'search_highlight'
         ]
     
     def get_author(self, obj):
@@ -219,6 +297,48 @@ class BlogListSerializer(serializers.ModelSerializer):
         }
     
 
+class RelatedBlogSerializer(serializers.ModelSerializer):
+    category = CategorySerializer(read_only=True)
+    featured_image_variants = ImageVariantsField()
+    
+    class Meta:
+        model = Blog
+        fields = [
+            'id', 'title', 'subtitle', 'slug', 'featured_image', 'featured_image_variants',
+            'category', 'reading_time', 'published_at'
+        ]
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = ['id', 'author_name', 'content', 'created_at']
+
+
+class CommentCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = ['author_name', 'author_email', 'content']
+
+
+class BlogRevisionSerializer(serializers.ModelSerializer):
+    is_keyframe = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = BlogRevision
+        fields = ['number', 'is_keyframe', 'size', 'created_at']
+
+
+class BlogImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    category = serializers.CharField(max_length=100, required=False, help_text=_("Category of posts without one"))
+    
+    def validate_file(self, value):
+        if not value.name.lower().endswith(('.md', '.markdown', '.tar', '.tar.gz', '.tgz')):
+            raise serializers.ValidationError(_("Upload a markdown file or a tarball of markdown files"))
+        return value
+
+
 class BlogUpdateSerializer(serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), 
@@ -260,4 +380,185 @@ class BlogUpdateSerializer(serializers.ModelSerializer):
         if tags_data is not None:
             instance.tags.set(tags_data)
             
-        return instance
\ No newline at end of file
+        return instance
+
+# Block diff serializers
+class BlockOperationSerializer(serializers.Serializer):
+    """Single insert, update or delete operation on a content block"""
+    OPERATIONS = ('insert', 'update', 'delete')
+    
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.UUIDField(required=False)
+    block = serializers.DictField(required=False)
+    
+    def validate(self, attrs):
+        op = attrs['op']
+        if op in ('update', 'delete') and not attrs.get('id'):
+            raise serializers.ValidationError({'id': _("Block id is required to %(op)s a block") % {'op': op}})
+        
+        if op in ('insert', 'update') and not attrs.get('block'):
+            raise serializers.ValidationError({'block': _("Block data is required to %(op)s a block") % {'op': op}})
+        
+        if op == 'insert':
+            serializer = ContentBlockSerializer(data=attrs['block'])
+            serializer.is_valid(raise_exception=True)
+            attrs['block'] = serializer.validated_data
+        
+        return attrs
+
+
+class BlogBlocksDiffSerializer(serializers.Serializer):
+    """
+    Applies a diff to the content blocks of a blog, touching only changed rows:
+    - operations: insert (with its target `order` index), update and delete by block id
+    - order: optional new order of the existing block ids, applied before inserts
+    Blocks are then renumbered 0..n in a single UPDATE of the rows that moved.
+    """
+    operations = BlockOperationSerializer(many=True, required=False)
+    order = serializers.ListField(child=serializers.UUIDField(), required=False)
+    
+    def validate(self, attrs):
+        blog = self.instance
+        existing = dict(blog.content_blocks.values_list('id', 'block_type'))
+        operations = attrs.get('operations', [])
+        
+        for operation in operations:
+            if operation['op'] == 'insert':
+                continue
+            
+            block_id = operation['id']
+            if block_id not in existing:
+                raise serializers.ValidationError({'operations': _("Block %(id)s doesn't belong to this blog") % {'id': block_id}})
+            
+            if operation['op'] == 'update':
+                relation = f"{existing[block_id]}_content"
+                payload = operation['block'].get(relation)
+                if payload is None:
+                    raise serializers.ValidationError({'operations': _("Block %(id)s expects %(relation)s") % {'id': block_id, 'relation': relation}})
+                if relation == 'image_content' and 'image' in payload:
+                    raise serializers.ValidationError({'operations': _("Replace an image by deleting and inserting its block")})
+                
+                content_serializer = ContentBlockSerializer().fields[relation].__class__(data=payload, partial=True)
+                content_serializer.is_valid(raise_exception=True)
+                operation['relation'] = relation
+                operation['content'] = content_serializer.validated_data
+        
+        self._validate_missing_content([operation for operation in operations if operation['op'] == 'update'])
+        
+        deleted = {operation['id'] for operation in operations if operation['op'] == 'delete'}
+        remaining = set(existing) - deleted
+        order = attrs.get('order')
+        if order is not None and (len(order) != len(remaining) or set(order) != remaining):
+            raise serializers.ValidationError({'order': _("Order must list every remaining block id exactly once")})
+        
+        return attrs
+    
+    def _validate_missing_content(self, updates):
+        """
+        A block without its typed content row gets one created by the update,
+        which then needs the full content, not only the changed fields
+        """
+        by_relation = {}
+        for operation in updates:
+            by_relation.setdefault(operation['relation'], []).append(operation)
+        
+        for relation, operations in by_relation.items():
+            content_field = ContentBlockSerializer().fields[relation]
+            present = set(content_field.Meta.model.objects.filter(
+                block_id__in=[operation['id'] for operation in operations]
+            ).values_list('block_id', flat=True))
+            for operation in operations:
+                if operation['id'] in present:
+                    continue
+                content_serializer = content_field.__class__(data=operation['block'][relation])
+                if not content_serializer.is_valid():
+                    raise serializers.ValidationError({'operations': {str(operation['id']): content_serializer.errors}})
+                operation['content'] = content_serializer.validated_data
+    
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        operations = validated_data.get('operations', [])
+        inserts = [operation['block'] for operation in operations if operation['op'] == 'insert']
+        updates = [operation for operation in operations if operation['op'] == 'update']
+        deleted = [operation['id'] for operation in operations if operation['op'] == 'delete']
+        
+        if deleted:
+            ContentBlock.objects.filter(blog=instance, id__in=deleted).delete()
+        
+        self._apply_updates(updates)
+        
+        # Final sequence: remaining blocks in the requested (or current) order,
+        # then every insert placed at its target index
+        current = list(
+            ContentBlock.objects.filter(blog=instance).order_by('order', 'created_at').values_list('id', 'order')
+        )
+        current_order = dict(current)
+        sequence = validated_data.get('order') or [block_id for block_id, order in current]
+        for block_data in sorted(inserts, key=lambda data: data.get('order', len(sequence))):
+            sequence.insert(min(block_data.get('order', len(sequence)), len(sequence)), block_data)
+        
+        new_blocks = []
+        moved = {}
+        for index, entry in enumerate(sequence):
+            if isinstance(entry, dict):
+                new_blocks.append(dict(entry, blog=instance, order=index))
+            elif current_order[entry] != index:
+                moved[entry] = index
+        
+        if new_blocks:
+            ContentBlockSerializer(many=True).create(new_blocks)
+        
+        if moved:
+            ContentBlock.objects.filter(id__in=moved).update(
+                order=Case(
+                    *[When(id=block_id, then=Value(index)) for block_id, index in moved.items()],
+                    output_field=IntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+        
+        Blog.objects.filter(id=instance.id).update(updated_at=timezone.now())
+        return instance
+    
+    def _apply_updates(self, updates):
+        """Write changed fields with one bulk update per content table"""
+        by_relation = {}
+        for operation in updates:
+            by_relation.setdefault(operation['relation'], {})[operation['id']] = dict(operation['content'])
+        
+        for relation, contents in by_relation.items():
+            content_model = ContentBlock._meta.get_field(relation).related_model
+            rows = {row.block_id: row for row in content_model.objects.filter(block_id__in=contents)}
+            
+            fields = set()
+            new_rows = []
+            # (row, items) pairs, a new row has no pk to be keyed by until it is created
+            replaced_items = []
+            for block_id, content in contents.items():
+                items_data = content.pop('items', None)
+                row = rows.get(block_id)
+                if row is None:
+                    row = content_model(block_id=block_id, **content)
+                    new_rows.append(row)
+                else:
+                    for field, value in content.items():
+                        setattr(row, field, value)
+                    fields.update(content)
+                if items_data is not None:
+                    replaced_items.append((row, items_data))
+            
+            if fields:
+                content_model.objects.bulk_update(list(rows.values()), fields)
+            if new_rows:
+                content_model.objects.bulk_create(new_rows)
+            if content_model is CodeBlock:
+                for row in [*rows.values(), *new_rows]:
+                    schedule_highlight(row)
+            
+            if replaced_items:
+                # new rows got their pk from bulk_create and have no items yet
+                ListItem.objects.filter(list_block__in=[row for row, _items in replaced_items]).delete()
+                ListItem.objects.bulk_create([
+                    ListItem(list_block=row, **item_data)
+                    for row, items_data in replaced_items for item_data in items_data
+                ])
@@ -3,8 +3,21 @@ from .views import (
     CreateNewBlog,
     BlogList,
     BlogDetails,
+    TrendingBlogList,
+    RelatedBlogList,
+    CommentList,
+    CreateNewComment,
     UpdateBlogDetails,
+    UpdateBlogBlocks,
+    BlogRevisionList,
+    BlogRevisionDetails,
+    BlogRevisionDiff,
+    RestoreBlogRevision,
     DeleteBlog,
+    BlogReadReport,
+    ImportBlogs,
+    BlogImportStatus,
+    ExportBlogs,
     CategoryList,
     CreateNewCategory,
     UpdateCategory,
@@ -33,9 +46,22 @@ tags_urls = [
 
 blog_urls = [
     path("list/", BlogList.as_view(), name="blog-list"),
+    path("trending/", TrendingBlogList.as_view(), name="trending-blogs"),
     path("create/", CreateNewBlog.as_view(), name="create-blog"),
+    path("import/", ImportBlogs.as_view(), name="import-blogs"),
+    path("import/<id>/", BlogImportStatus.as_view(), name="import-status"),
+    path("export/", ExportBlogs.as_view(), name="export-blogs"),
+    path("readers/report/", BlogReadReport.as_view(), name="blog-read-report"),
     path("<id>/", BlogDetails.as_view(), name="blog-details"),
+    path("<id>/related/", RelatedBlogList.as_view(), name="related-blogs"),
+    path("<id>/comments/", CommentList.as_view(), name="comment-list"),
+    path("<id>/comments/create/", CreateNewComment.as_view(), name="create-comment"),
     path("update/<id>/", UpdateBlogDetails.as_view(), name="update-blog"),
+    path("update/<id>/blocks/", UpdateBlogBlocks.as_view(), name="update-blog-blocks"),
+    path("<id>/revisions/", BlogRevisionList.as_view(), name="blog-revisions"),
+    path("<id>/revisions/diff/", BlogRevisionDiff.as_view(), name="blog-revision-diff"),
+    path("<id>/revisions/<int:number>/", BlogRevisionDetails.as_view(), name="blog-revision-details"),
+    path("<id>/revisions/<int:number>/restore/", RestoreBlogRevision.as_view(), name="restore-blog-revision"),
     path("delete/<id>/", DeleteBlog.as_view(), name="delete-blog"),
 ]
 
@@ -1,14 +1,21 @@
+import os
+import uuid
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import F, Q
+from django.utils.dateparse import parse_date
+from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 
 # restframework utils
 from rest_framework import generics, status
-from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 
 # models
-from blogs.models import Blog, ContentBlock, Category, Tag
+from blogs.models import Blog, ContentBlock, Category, Tag, Comment, BlogRevision
 
 # serializers
 from blogs.v1.serializers import (
@@ -16,16 +23,36 @@ from blogs.v1.serializers import (
     BlogDetailSerializer, 
     BlogListSerializer,
     BlogUpdateSerializer,
+    BlogBlocksDiffSerializer,
+    BlogImportSerializer,
+    BlogRevisionSerializer,
+    RelatedBlogSerializer,
+    CommentSerializer,
+    CommentCreateSerializer,
     CategorySerializer,
-    TagSerializer
+    CategoryListSerializer,
+    TagSerializer,
+    TagListSerializer,
 
 )
 
 # helpers
 from blogs.v1 import res_msg
-from blogs.helpers.blog_filter import BlogFilter
-from base.helpers.pagination import CustomPagination
+from blogs.helpers.blog_filter import BlogFilter, BlogSearchFilter, TrendingOrderingFilter
+from blogs.helpers.blog_snapshot import get_blog_snapshot, absolute_media_urls
+from blogs.helpers.view_counter import record_view
+from blogs.helpers.blog_readers import reader_id, read_stats_report
+from blogs.helpers.blog_list_cache import blog_list_tags, TRENDING_SCOPE
+from blogs.helpers.comments import comments_scope, schedule_moderation
+from blogs.helpers.code_highlight import wants_highlight, strip_highlight
+from blogs.helpers.blog_revisions import ensure_base_revision, get_revision_document, diff_revisions, restore_revision
+from blogs.helpers.blog_markdown import import_markdown_task, import_report_key, stream_markdown_tarball, IMPORT_REPORT_TIMEOUT
+from blogs.signals import blog_body_changed
+from base.helpers.pagination import CustomPagination, CustomCursorPagination, CursorPaginationMixin
 from base.helpers.response import APIResponse
+from base.helpers.conditional import ConditionalGetMixin, get_versioned
+from base.helpers.response_cache import TaggedResponseCacheMixin
+from base.helpers.streaming import iterate_in_thread
 
 
 class CreateNewBlog(generics.CreateAPIView):
@@ -44,6 +71,7 @@ class CreateNewBlog(generics.CreateAPIView):
             serializer.validated_data['published_at'] = timezone.now()
         
         blog = serializer.save()
+        blog = Blog.objects.with_document().get(id=blog.id)
         response_data = BlogDetailSerializer(blog, context={'request': request}).data 
         
         # Return serialized data for the created blog
@@ -54,18 +82,24 @@ class CreateNewBlog(generics.CreateAPIView):
         )
 
 
-class BlogList(generics.ListAPIView):
+class BlogList(ConditionalGetMixin, TaggedResponseCacheMixin, CursorPaginationMixin, generics.ListAPIView):
     """API View to get blog list with pagination, filtering and search"""
+    version_scope = 'blogs'
+    response_cache_prefix = 'blogs:list'
     serializer_class = BlogListSerializer
     permission_classes = [AllowAny]
     pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TrendingOrderingFilter, BlogSearchFilter]
     filterset_class = BlogFilter
-    search_fields = ['title', 'subtitle', 'excerpt', 'author__username']
     ordering_fields = ['published_at', 'view_count', 'title']
     ordering = ['-published_at']
     RES_LANG = "en"
     
+    def get_version_scope(self):
+        if self.request.query_params.get('ordering') == 'trending':
+            return [self.version_scope, TRENDING_SCOPE]
+        return self.version_scope
+    
     def get_queryset(self):
         # By default, only show published blogs
         queryset = Blog.objects.filter(status='published')
@@ -77,11 +111,20 @@ class BlogList(generics.ListAPIView):
             )
             
         # Add prefetch related to optimize queries
-        queryset = queryset.select_related('author').prefetch_related('category', 'tags')
+        queryset = queryset.select_related('author').prefetch_related('category', 'tags').defer('search_vector')
         
         return queryset
     
     def list(self, request, *args, **kwargs):
+        # Anonymous queries are answered from the tagged response cache
+        data = self.get_cached_data(request, self.render_list)
+        
+        return APIResponse.success(
+            data=data, 
+            message=res_msg.BLOG_LIST[self.RES_LANG]
+        )
+    
+    def render_list(self):
         queryset = self.filter_queryset(self.get_queryset())
         
         # Apply pagination
@@ -93,14 +136,11 @@ class BlogList(generics.ListAPIView):
             serializer = self.get_serializer(queryset, many=True)
             data = serializer.data
         
-        return APIResponse.success(
-            data=data, 
-            message=res_msg.BLOG_LIST[self.RES_LANG]
-        )
+        return data, blog_list_tags(page if page is not None else queryset, self.request.query_params)
 
 
-class BlogDetails(generics.RetrieveAPIView):
-    """API View to get blog details with id"""
+class BlogDetails(ConditionalGetMixin, generics.RetrieveAPIView):
+    """API View to get blog details with id, served from the pre-rendered snapshot"""
     
     serializer_class = BlogDetailSerializer
     RES_LANG = "en"
@@ -108,27 +148,164 @@ class BlogDetails(generics.RetrieveAPIView):
     def get_queryset(self):
         return Blog.objects.all()
     
-    def get_object(self):
-        lookup_value = self.kwargs.get('id')
+    def get_version_scope(self):
         try:
-            blog = Blog.objects.get(id=lookup_value)
-            # Increment view count
-            Blog.objects.filter(id=lookup_value).update(view_count=F('view_count') + 1)
-            return blog
-        
-        except Blog.DoesNotExist:
-            return APIResponse.error(message=res_msg.BLOG_NOT_FOUND[self.RES_LANG])
+            return f"blog:{uuid.UUID(str(self.kwargs.get('id')))}"
+        except ValueError:
+            # not a blog, answered 404 without storing a version for it
+            return None
+    
+    def not_modified(self, request, response):
+        # A revalidated read is still a view
+        record_view(self.kwargs.get('id'), reader=reader_id(request))
+        return response
     
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
+        lookup_value = self.kwargs.get('id')
+        document = get_blog_snapshot(lookup_value)
+        if document is None:
+            return APIResponse.error(
+                message=res_msg.BLOG_NOT_FOUND[self.RES_LANG],
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # The snapshot carries the highlighted code html, sent on request only
+        if not wants_highlight(self.get_serializer_context()):
+            document = strip_highlight(document)
+        document = absolute_media_urls(document, request)
+        
+        # Buffer the view, flushed to the db periodically
+        view_count = record_view(document['id'], document['view_count'], reader=reader_id(request))
+        document = dict(document, view_count=view_count)
         
         return APIResponse.success(
-            data=serializer.data,
+            data=document,
             message=res_msg.BLOG_DETAILS[self.RES_LANG]
         )
 
 
+class TrendingBlogList(ConditionalGetMixin, generics.ListAPIView):
+    """API View to get the trending blogs, served from the periodic ranking snapshot"""
+    
+    version_scope = ['blogs', TRENDING_SCOPE]
+    serializer_class = BlogListSerializer
+    permission_classes = [AllowAny]
+    RES_LANG = "en"
+    
+    def get_queryset(self):
+        return Blog.objects.filter(trending__isnull=False, status='published') \
+            .select_related('author', 'category').prefetch_related('tags') \
+            .defer('search_vector').order_by('trending__rank')
+    
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return APIResponse.success(
+            data=serializer.data,
+            message=res_msg.TRENDING_BLOG_LIST[self.RES_LANG]
+        )
+
+
+class RelatedBlogList(generics.ListAPIView):
+    """API View to get the precomputed related blogs of a blog, in rank order"""
+    
+    serializer_class = RelatedBlogSerializer
+    permission_classes = [AllowAny]
+    RES_LANG = "en"
+    
+    def get_queryset(self):
+        # one lookup on the related blogs index, joined to the blogs it points at
+        return Blog.objects.filter(related_to__blog_id=self.kwargs.get('id'), status='published') \
+            .select_related('category').defer('search_vector').order_by('related_to__rank')
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            uuid.UUID(str(self.kwargs.get('id')))
+        except ValueError:
+            return APIResponse.error(
+                message=res_msg.BLOG_NOT_FOUND[self.RES_LANG],
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return APIResponse.success(
+            data=serializer.data,
+            message=res_msg.RELATED_BLOG_LIST[self.RES_LANG]
+        )
+
+
+class CommentCursorPagination(CustomCursorPagination):
+    # the blog's comment_count is exact, the table estimate would only mislead
+    include_approximate_count = False
+
+
+class CommentList(ConditionalGetMixin, generics.ListAPIView):
+    """API View to get the approved comments of a blog, newest first, by cursor"""
+    
+    serializer_class = CommentSerializer
+    permission_classes = [AllowAny]
+    pagination_class = CommentCursorPagination
+    RES_LANG = "en"
+    
+    def get_version_scope(self):
+        try:
+            return comments_scope(uuid.UUID(str(self.kwargs.get('id'))))
+        except ValueError:
+            # not a blog, answered 404 without storing a version for it
+            return None
+    
+    def get_queryset(self):
+        # served by the partial (blog, -created_at, -id) index of approved comments
+        return Comment.objects.filter(blog_id=self.kwargs.get('id'), is_approved=True).order_by('-created_at')
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            uuid.UUID(str(self.kwargs.get('id')))
+        except ValueError:
+            return APIResponse.error(
+                message=res_msg.BLOG_NOT_FOUND[self.RES_LANG],
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        
+        return APIResponse.success(
+            data=self.get_paginated_response(serializer.data).data,
+            message=res_msg.COMMENT_LIST[self.RES_LANG]
+        )
+
+
+class CreateNewComment(generics.CreateAPIView):
+    """API View to submit a comment on a published blog, moderated in the background"""
+    
+    serializer_class = CommentCreateSerializer
+    permission_classes = [AllowAny]
+    RES_LANG = "en"
+    
+    def create(self, request, *args, **kwargs):
+        try:
+            blog_id = uuid.UUID(str(self.kwargs.get('id')))
+        except ValueError:
+            blog_id = None
+        blog = Blog.objects.filter(id=blog_id, status='published').only('id').first() if blog_id else None
+        if blog is None:
+            return APIResponse.error(
+                message=res_msg.BLOG_NOT_FOUND[self.RES_LANG],
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comment = serializer.save(blog=blog, is_approved=False)
+        schedule_moderation(comment.id)
+        
+        return APIResponse.success(
+            data=CommentSerializer(comment).data,
+            message=res_msg.COMMENT_RECEIVED[self.RES_LANG],
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
 class UpdateBlogDetails(generics.UpdateAPIView):
     """API View to update blog with id"""
     
@@ -156,7 +333,9 @@ class UpdateBlogDetails(generics.UpdateAPIView):
         
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        updated_blog = serializer.save()
+        # keep the state before the first tracked edit of older blogs
+        ensure_base_revision(instance.id)
+        updated_blog = Blog.objects.with_document().get(id=serializer.save().id)
         
         # Return the updated blog with all details
         return APIResponse.success(
@@ -170,6 +349,153 @@ class UpdateBlogDetails(generics.UpdateAPIView):
         return self.update(request, *args, **kwargs)
 
 
+class UpdateBlogBlocks(generics.UpdateAPIView):
+    """API View to apply a block level diff to the content of a blog"""
+    
+    serializer_class = BlogBlocksDiffSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+    http_method_names = ["patch"]
+    RES_LANG = "en"
+    
+    def get_queryset(self):
+        return Blog.objects.all()
+    
+    def update(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ensure_base_revision(instance.id)
+        serializer.save()
+        
+        # content updates and reorders are bulk queries without signals,
+        # refresh the body of this blog only, the lists don't show it
+        blog_body_changed(instance.id)
+        updated_blog = Blog.objects.with_document().get(id=instance.id)
+        
+        return APIResponse.success(
+            data=BlogDetailSerializer(updated_blog, context={'request': request}).data,
+            message=res_msg.BLOG_BLOCKS_UPDATED[self.RES_LANG],
+            status=status.HTTP_205_RESET_CONTENT
+        )
+
+
+class BlogRevisionMixin:
+    """Resolves the blog of the url, None when the id isn't a blog"""
+    
+    def get_blog(self):
+        try:
+            blog_id = uuid.UUID(str(self.kwargs.get('id')))
+        except ValueError:
+            return None
+        return Blog.objects.filter(id=blog_id).first()
+    
+    def blog_not_found(self):
+        return APIResponse.error(
+            message=res_msg.BLOG_NOT_FOUND[self.RES_LANG],
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    def revision_not_found(self):
+        return APIResponse.error(
+            message=res_msg.BLOG_REVISION_NOT_FOUND[self.RES_LANG],
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+
+class BlogRevisionList(BlogRevisionMixin, generics.ListAPIView):
+    """API View to get the revisions of a blog, newest first"""
+    
+    serializer_class = BlogRevisionSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CustomPagination
+    RES_LANG = "en"
+    
+    def get_queryset(self):
+        return BlogRevision.objects.filter(blog_id=self.kwargs.get('id')).defer('data').order_by('-number')
+    
+    def list(self, request, *args, **kwargs):
+        if self.get_blog() is None:
+            return self.blog_not_found()
+        
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        
+        return APIResponse.success(
+            data=self.get_paginated_response(serializer.data).data,
+            message=res_msg.BLOG_REVISION_LIST[self.RES_LANG]
+        )
+
+
+class BlogRevisionDetails(BlogRevisionMixin, generics.GenericAPIView):
+    """API View to get the document of a blog revision"""
+    
+    permission_classes = [IsAuthenticated]
+    RES_LANG = "en"
+    
+    def get(self, request, *args, **kwargs):
+        blog = self.get_blog()
+        if blog is None:
+            return self.blog_not_found()
+        
+        document = get_revision_document(blog.id, self.kwargs.get('number'))
+        if document is None:
+            return self.revision_not_found()
+        
+        return APIResponse.success(
+            data={'number': self.kwargs.get('number'), 'document': document},
+            message=res_msg.BLOG_REVISION_DETAILS[self.RES_LANG]
+        )
+
+
+class BlogRevisionDiff(BlogRevisionMixin, generics.GenericAPIView):
+    """API View to compare two revisions of a blog, `?from=<number>&to=<number>`"""
+    
+    permission_classes = [IsAuthenticated]
+    RES_LANG = "en"
+    
+    def get(self, request, *args, **kwargs):
+        blog = self.get_blog()
+        if blog is None:
+            return self.blog_not_found()
+        
+        try:
+            source, target = int(request.query_params['from']), int(request.query_params['to'])
+        except (KeyError, ValueError):
+            return self.revision_not_found()
+        
+        diff = diff_revisions(blog.id, source, target)
+        if diff is None:
+            return self.revision_not_found()
+        
+        return APIResponse.success(
+            data=diff,
+            message=res_msg.BLOG_REVISION_DIFF[self.RES_LANG]
+        )
+
+
+class RestoreBlogRevision(BlogRevisionMixin, generics.GenericAPIView):
+    """API View to bring a blog back to one of its revisions"""
+    
+    permission_classes = [IsAuthenticated]
+    RES_LANG = "en"
+    
+    def post(self, request, *args, **kwargs):
+        blog = self.get_blog()
+        if blog is None:
+            return self.blog_not_found()
+        
+        ensure_base_revision(blog.id)
+        if not restore_revision(blog, self.kwargs.get('number')):
+            return self.revision_not_found()
+        
+        restored_blog = Blog.objects.with_document().get(id=blog.id)
+        return APIResponse.success(
+            data=BlogDetailSerializer(restored_blog, context={'request': request}).data,
+            message=res_msg.BLOG_REVISION_RESTORED[self.RES_LANG]
+        )
+
+
 class DeleteBlog(generics.DestroyAPIView):
     """API View to delete blog with id"""
     
@@ -205,6 +531,92 @@ class DeleteBlog(generics.DestroyAPIView):
         )
     
 
+class BlogReadReport(generics.GenericAPIView):
+    """API View to get views and reader estimates per blog and day, `?from=&to=` dates, the last 30 days by default"""
+    
+    permission_classes = [IsAdminUser]
+    RES_LANG = "en"
+    
+    @staticmethod
+    def query_date(value):
+        try:
+            return parse_date(value or '')
+        except ValueError:
+            return None
+    
+    def get(self, request, *args, **kwargs):
+        date_to = self.query_date(request.query_params.get('to')) or timezone.now().date()
+        date_from = self.query_date(request.query_params.get('from')) or date_to - timedelta(days=29)
+        
+        return APIResponse.success(
+            data=read_stats_report(date_from, date_to),
+            message=res_msg.BLOG_READ_REPORT[self.RES_LANG]
+        )
+
+
+class ImportBlogs(generics.CreateAPIView):
+    """API View to import a markdown file or a tarball of markdown files as blogs, in the background"""
+    
+    serializer_class = BlogImportSerializer
+    permission_classes = [IsAdminUser]
+    RES_LANG = "en"
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        
+        # the worker reads the upload back from the storage
+        import_id = uuid.uuid4().hex
+        upload_name = default_storage.save(f"imports/{import_id}-{os.path.basename(upload.name)}", upload)
+        cache.set(import_report_key(import_id), {'status': 'queued'}, IMPORT_REPORT_TIMEOUT)
+        import_markdown_task.delay(import_id, upload_name, request.user.pk, serializer.validated_data.get('category'))
+        
+        return APIResponse.success(
+            data={'id': import_id},
+            message=res_msg.BLOG_IMPORT_QUEUED[self.RES_LANG],
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class BlogImportStatus(generics.GenericAPIView):
+    """API View to get the status and report of a blog import"""
+    
+    permission_classes = [IsAdminUser]
+    RES_LANG = "en"
+    
+    def get(self, request, *args, **kwargs):
+        report = cache.get(import_report_key(self.kwargs.get('id')))
+        if report is None:
+            return APIResponse.error(
+                message=res_msg.BLOG_IMPORT_NOT_FOUND[self.RES_LANG],
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return APIResponse.success(
+            data=report,
+            message=res_msg.BLOG_IMPORT_STATUS[self.RES_LANG]
+        )
+
+
+class ExportBlogs(generics.GenericAPIView):
+    """API View to download every blog as markdown, streamed as a gzipped tarball"""
+    
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, *args, **kwargs):
+        queryset = Blog.objects.all()
+        if request.query_params.get('status'):
+            queryset = queryset.filter(status=request.query_params['status'])
+        
+        filename = f"blogs-{timezone.now():%Y%m%d-%H%M%S}.tar.gz"
+        # chunks are built in a thread, under ASGI a sync generator would be buffered whole
+        chunks = iterate_in_thread(stream_markdown_tarball(queryset), batch_size=1)
+        response = StreamingHttpResponse(chunks, content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 # -------------
 # Category
 # -------------
@@ -227,19 +639,20 @@ class CreateNewCategory(generics.CreateAPIView):
         )
     
 
-class CategoryList(generics.ListAPIView):
+class CategoryList(ConditionalGetMixin, generics.ListAPIView):
     """API View to get category list"""
     
     RES_LANG = 'en'
-    serializer_class = CategorySerializer
+    version_scope = 'categories'
+    serializer_class = CategoryListSerializer
     queryset = Category.objects.all()
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        # published counts are kept on the rows, the listing is cached until a category changes
+        data = get_versioned(self.version_scope, 'list', lambda: self.get_serializer(self.get_queryset(), many=True).data)
 
         return APIResponse.success(
-            data=serializer.data, 
+            data=data, 
             message=res_msg.CATEGORY_LIST[self.RES_LANG]
         )
     
@@ -306,19 +719,20 @@ class CreateNewTag(generics.CreateAPIView):
         )
     
 
-class TagList(generics.ListAPIView):
+class TagList(ConditionalGetMixin, generics.ListAPIView):
     """API View to get tag list"""
     
     RES_LANG = 'en'
-    serializer_class = TagSerializer
+    version_scope = 'tags'
+    serializer_class = TagListSerializer
     queryset = Tag.objects.all()
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        # published counts are kept on the rows, the listing is cached until a tag changes
+        data = get_versioned(self.version_scope, 'list', lambda: self.get_serializer(self.get_queryset(), many=True).data)
 
         return APIResponse.success(
-            data=serializer.data, 
+            data=data, 
             message=res_msg.TAG_LIST[self.RES_LANG]
         )
     
@@ -1,21 +1,22 @@
 import logging
-from django.conf import settings
-
-from huggingface_hub import InferenceClient
+from asgiref.sync import sync_to_async
 
+from .llm_clients import get_inference_client, get_async_inference_client
+from .answer_cache import get_answer_cache
 from .summerize import summarize_conversation_task
 
 logger = logging.getLogger(__name__)
 
+PROVIDER_ERROR_REPLY = "Sorry, I'm having trouble connecting to my brain right now. Please try again later."
+
 class AIResponseGenerator:
     """Class to handle AI response generation using Hugging Face InferenceClient with Fireworks AI"""
     
     def __init__(self, model_id="meta-llama/Llama-3.1-8B-Instruct"):
-        self.client = InferenceClient(
-            provider="fireworks-ai",
-            api_key=settings.HF_TOKEN,
-            model=model_id
-        )
+        # clients are shared by the process, their connections stay open between messages
+        self.client = get_inference_client(model_id)
+        # used by the streaming endpoint, which runs on the event loop
+        self.async_client = get_async_inference_client(model_id)
 
         # System prompt
         self.system_prompt = (
@@ -38,19 +39,89 @@ class AIResponseGenerator:
             return completion.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"Error querying Fireworks AI via InferenceClient: {e}")
-            return "Sorry, I'm having trouble connecting to my brain right now. Please try again later."
+            return PROVIDER_ERROR_REPLY
+    
+    async def stream_query(self, messages, on_complete=None):
+        """
+        Yield the completion piece by piece as the provider streams it, then
+        await `on_complete` with the whole reply if the stream ran to its end
+        """
+        tokens = []
+        stream = None
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.async_client.model,
+                messages=messages,
+                max_tokens=100,
+                temperature=0.7,
+                top_p=0.95,
+                stream=True,
+            )
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    tokens.append(token)
+                    yield token
+        except Exception as e:
+            logger.error(f"Error streaming from Fireworks AI via AsyncInferenceClient: {e}")
+            # a reply cut short keeps what was sent, an empty one gets the apology
+            if not tokens:
+                yield PROVIDER_ERROR_REPLY
+        else:
+            if on_complete is not None:
+                await on_complete(''.join(tokens))
+        finally:
+            # a client gone mid-reply leaves the response unread, its connection must not leak
+            if stream is not None:
+                await stream.aclose()
+            await self.async_client.close_request()
+    
+    def build_messages(self, user_query, conversation_summary):
+        """Format the input with the system prompt, conversation summary and user query"""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "system", "content": conversation_summary},
+            {"role": "user", "content": user_query}
+        ]
+    
+    def stream_response(self, user_query, conversation_summary):
+        """Async iterator over the tokens of the response to a user query, a cached answer comes as one token"""
+        messages = self.build_messages(user_query, conversation_summary or "")
+        # only questions opening a conversation get the same answer whoever asks
+        answer_cache = get_answer_cache() if not conversation_summary else None
+        if answer_cache is None:
+            return self.stream_query(messages)
+        return self.stream_cached(answer_cache, user_query, messages)
+    
+    async def stream_cached(self, answer_cache, user_query, messages):
+        """Stream the cached answer, or the provider's one and store it once complete"""
+        # embedding the question and reading the versions block, so they run off the event loop
+        answer, vector = await sync_to_async(answer_cache.get, thread_sensitive=False)(user_query)
+        if answer is not None:
+            yield answer
+            return
+        
+        async def store(reply):
+            if reply:
+                await sync_to_async(answer_cache.put, thread_sensitive=False)(user_query, reply, vector)
+        
+        async for token in self.stream_query(messages, on_complete=store):
+            yield token
     
     def generate_response(self, user_query, conversation_summary):
-        """Generate a response to a user query"""
+        """Generate a response to a user query, or reuse the answer to a similar question"""
         try:
-            # Format the input with the system prompt and user query
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "system", "content": conversation_summary},
-                {"role": "user", "content": user_query}
-            ]
+            # only questions opening a conversation get the same answer whoever asks
+            answer_cache = get_answer_cache() if not conversation_summary else None
+            vector = None
+            if answer_cache is not None:
+                answer, vector = answer_cache.get(user_query)
+                if answer is not None:
+                    return answer
             
-            response = self.query(messages)
+            response = self.query(self.build_messages(user_query, conversation_summary))
+            if answer_cache is not None and response != PROVIDER_ERROR_REPLY:
+                answer_cache.put(user_query, response, vector)
             return response
             
         except Exception as e:
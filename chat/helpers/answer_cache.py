@@ -0,0 +1,165 @@
+import re
+import time
+import logging
+import threading
+import redis
+from collections import OrderedDict
+from django.conf import settings
+
+from chat.helpers.llm_clients import get_embedding_client
+from chat.helpers.vector_index import VectorIndex
+from base.helpers.conditional import get_versions
+from base.helpers.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "chat:answer-cache:metrics"
+# the answers are drawn from the portfolio, a change to it invalidates them
+PORTFOLIO_SCOPES = ('projects', 'services', 'skills', 'experiences')
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """Lowercase without punctuation and repeated spaces, so trivial variations share an entry"""
+    return SPACES.sub(' ', NON_WORD.sub(' ', query.lower())).strip()
+
+
+def embed_query(text):
+    result = get_embedding_client().models.embed_content(
+        model=settings.CHAT_EMBEDDING_MODEL,
+        contents=text,
+        config={'task_type': 'SEMANTIC_SIMILARITY'},
+    )
+    return result.embeddings[0].values
+
+
+def _count(metric):
+    try:
+        get_redis().hincrby(METRICS_KEY, metric, 1)
+    except redis.RedisError as e:
+        logger.warning(f"Answer cache metrics unavailable, {metric} not counted: {e}")
+
+
+class AnswerCache:
+    """
+    Answers of the process keyed by their normalized question, least recently
+    used first. A question is served the answer of the most similar cached one
+    above the threshold.
+    """
+
+    def __init__(self, max_size, ttl, threshold):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        # normalized query -> (answer, stored at), the vectors are in the index
+        self.entries = OrderedDict()
+        self.index = None
+        self.versions = None
+        self.lock = threading.Lock()
+
+    def _check_versions(self):
+        """Drop the answers older than the portfolio, False when its version can't be read"""
+        try:
+            versions = get_versions(*PORTFOLIO_SCOPES)
+        except redis.RedisError as e:
+            logger.warning(f"Portfolio versions unavailable, answer cache skipped: {e}")
+            return False
+
+        versions = tuple(versions[scope] for scope in PORTFOLIO_SCOPES)
+        if versions != self.versions:
+            if self.entries:
+                _count('invalidations')
+            self.entries.clear()
+            self.index = None
+            self.versions = versions
+        return True
+
+    def _drop(self, keys):
+        for key in keys:
+            del self.entries[key]
+        if self.index is not None:
+            self.index.delete(keys)
+
+    def _expire(self, now):
+        self._drop([key for key, (_answer, stored_at) in self.entries.items() if now - stored_at >= self.ttl])
+
+    def _search(self, vector):
+        if self.index is None:
+            return None
+        found = self.index.search(vector, top_k=1, min_score=self.threshold)
+        return found[0][0] if found else None
+
+    def get(self, query):
+        """
+        The cached answer to a question and the question's embedding, to store
+        the answer with on a miss. The embedding is None when not computed.
+        """
+        key = normalize_query(query)
+        with self.lock:
+            # the cached answers may be stale, the question goes to the provider
+            if not self._check_versions():
+                return None, None
+            self._expire(time.time())
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                _count('hits')
+                return self.entries[key][0], None
+
+        try:
+            vector = embed_query(key)
+        except Exception as e:
+            logger.warning(f"Could not embed the chat query: {e}")
+            _count('misses')
+            return None, None
+
+        with self.lock:
+            match = self._search(vector)
+            if match is not None:
+                self.entries.move_to_end(match)
+                _count('hits')
+                return self.entries[match][0], vector
+        _count('misses')
+        return None, vector
+
+    def put(self, query, answer, vector):
+        if vector is None:
+            return
+        with self.lock:
+            key = normalize_query(query)
+            if self.index is None:
+                self.index = VectorIndex(len(vector))
+            self.entries.pop(key, None)
+            self.entries[key] = (answer, time.time())
+            self.index.add([key], [vector])
+            if len(self.entries) > self.max_size:
+                self._drop(list(self.entries)[:len(self.entries) - self.max_size])
+        _count('stores')
+
+
+_cache = None
+
+
+def get_answer_cache():
+    """The process wide answer cache, None when disabled by a zero size"""
+    global _cache
+    if _cache is None and settings.CHAT_ANSWER_CACHE_SIZE > 0:
+        _cache = AnswerCache(
+            max_size=settings.CHAT_ANSWER_CACHE_SIZE,
+            ttl=settings.CHAT_ANSWER_CACHE_TTL,
+            threshold=settings.CHAT_ANSWER_CACHE_THRESHOLD,
+        )
+    return _cache
+
+
+def answer_cache_stats():
+    """Hits, misses, stores and invalidations of every process since the last reset, with the hit rate"""
+    stats = {metric: 0 for metric in ('hits', 'misses', 'stores', 'invalidations')}
+    stats.update({metric.decode(): int(count) for metric, count in get_redis().hgetall(METRICS_KEY).items()})
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_answer_cache_stats():
+    get_redis().delete(METRICS_KEY)
@@ -0,0 +1,43 @@
+import json
+import asyncio
+import logging
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from chat.helpers.ai_response import AIResponseGenerator
+from chat.helpers.chat_turn import release_connections, finish_turn
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    """One server-sent event, json data keeps newlines inside a single data line"""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream_turn(conversation, query):
+    """
+    Server-sent events of one chat turn: `conversation` first, a `token` per
+    streamed piece of the reply, then `done` once the reply is stored. A client
+    leaving early still gets the part it was sent stored.
+    """
+    # no connection is held while the reply streams
+    await sync_to_async(release_connections)()
+    yield sse_event('conversation', {'conversation_id': str(conversation.id)})
+
+    tokens = []
+    try:
+        async for token in AIResponseGenerator().stream_response(query, conversation.summary):
+            tokens.append(token)
+            yield sse_event('token', {'text': token})
+    except (asyncio.CancelledError, GeneratorExit):
+        if tokens:
+            await sync_to_async(finish_turn)(conversation, query, ''.join(tokens).strip())
+        raise
+
+    ai_message = await sync_to_async(finish_turn)(conversation, query, ''.join(tokens).strip())
+    yield sse_event('done', {
+        'conversation_id': str(conversation.id),
+        'response': ai_message.content,
+        'created_at': ai_message.created_at,
+    })
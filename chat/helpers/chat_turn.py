@@ -0,0 +1,138 @@
+import logging
+from datetime import timedelta
+from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from chat.models import Conversation, Message
+from chat.choices import MessageSenderChoice
+from chat.helpers.ai_response import AIResponseGenerator
+from chat.helpers.summerize import summarize_conversation_task
+from base.helpers.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+PENDING_LOCK_KEY = "chat:pending-replies-lock"
+# visitor messages older than this are no longer answered
+PENDING_REPLY_WINDOW = timedelta(days=1)
+# a batch of slow generations fits the soft limit, the rest waits for the next run
+PENDING_REPLY_BATCH = 10
+PENDING_SOFT_TIME_LIMIT = 5 * 60
+
+
+# -------------
+# Phases of a chat turn: two short writes around the generation,
+# which holds neither a transaction nor a database connection
+# -------------
+def conversation_title(query):
+    return query[:40] if len(query) <= 40 else f"{query[:37]}..."
+
+
+def start_turn(visitor, query, conversation_id=None):
+    """
+    Store the visitor's message, in the given conversation of the visitor or a
+    new one. Returns the conversation and the message.
+    """
+    with transaction.atomic():
+        conversation = None
+        if conversation_id:
+            conversation = Conversation.objects.filter(id=conversation_id, user=visitor).first()
+        if conversation is None:
+            conversation = Conversation.objects.create(user=visitor, title=conversation_title(query))
+
+        message = Message.objects.create(conversation=conversation, sender=MessageSenderChoice.VISITOR, content=query)
+    return conversation, message
+
+
+def release_connections():
+    """
+    Close the database connections of this thread before a slow network call,
+    the next query reopens them. Connections inside a transaction are kept.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def generate_reply(conversation, query, generator=None):
+    """Generate the AI reply to a visitor message, without holding a database connection"""
+    release_connections()
+    generator = generator or AIResponseGenerator()
+    return generator.generate_response(query, conversation.summary or "")
+
+
+def finish_turn(conversation, query, reply, summarize=True):
+    """Store the AI reply and update the conversation summary in the background"""
+    ai_message = Message.objects.create(conversation=conversation, sender=MessageSenderChoice.AI, content=reply)
+    if summarize:
+        summarize_conversation_task.delay(
+            conversation_id=conversation.id,
+            prev_summary=conversation.summary,
+            user_query=query,
+            ai_response=reply
+        )
+    return ai_message
+
+
+# -------------
+# Pending replies
+# -------------
+def pending_messages(older_than):
+    """
+    Visitor messages left without a reply, by a request or stream that died
+    between storing the message and storing the reply
+    """
+    now = timezone.now()
+    replied = Message.objects.filter(
+        conversation=OuterRef('conversation'), sender=MessageSenderChoice.AI, created_at__gte=OuterRef('created_at'),
+    )
+    return (
+        Message.objects.filter(
+            sender=MessageSenderChoice.VISITOR,
+            created_at__lt=now - older_than,
+            created_at__gte=now - PENDING_REPLY_WINDOW,
+        )
+        .filter(~Exists(replied))
+        .select_related('conversation')
+        .order_by('created_at')
+    )
+
+
+def answer_pending_messages(older_than=None, limit=PENDING_REPLY_BATCH):
+    """Generate and store the missing replies, oldest first. Returns the number answered."""
+    if older_than is None:
+        older_than = timedelta(seconds=settings.CHAT_PENDING_REPLY_SECONDS)
+    answered = 0
+    for message in list(pending_messages(older_than)[:limit]):
+        # a later message of the visitor already moved the conversation on
+        if Message.objects.filter(conversation_id=message.conversation_id, created_at__gt=message.created_at).exists():
+            continue
+        try:
+            reply = generate_reply(message.conversation, message.content)
+            finish_turn(message.conversation, message.content, reply)
+            answered += 1
+        except SoftTimeLimitExceeded:
+            # the task is out of time, not the message at fault
+            raise
+        except Exception as e:
+            logger.exception(f"Could not answer pending message {message.id}: {e}")
+    return answered
+
+
+@shared_task(soft_time_limit=PENDING_SOFT_TIME_LIMIT, time_limit=PENDING_SOFT_TIME_LIMIT + 60)
+def answer_pending_messages_task():
+    """Periodic task to answer the visitor messages whose reply was never stored"""
+    # the lock outlives the task's hard time limit
+    lock = get_redis().lock(PENDING_LOCK_KEY, timeout=PENDING_SOFT_TIME_LIMIT + 120, blocking=False)
+    if not lock.acquire():
+        return
+
+    try:
+        answered = answer_pending_messages()
+        if answered:
+            logger.info(f"Answered {answered} pending chat messages")
+    finally:
+        lock.release()
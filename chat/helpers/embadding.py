@@ -1,5 +1,11 @@
-from google import genai
+import os
+import hashlib
+import threading
 from typing import List
+from django.conf import settings
+
+from chat.helpers.llm_clients import get_embedding_client
+from chat.helpers.vector_index import VectorIndex
 
 # Assuming you have your data structured like this (or from a CSV/DB)
 portfolio_data = [
@@ -12,27 +18,91 @@ portfolio_data = [
     # ... add all your detailed data here
 ]
 
-# Initialize embedding model (one-time)
-embedding_model = genai.get_embedding_model("text-embedding-004")
-
-# This is where you'd connect to your vector database and insert embeddings
-# For demonstration, let's just create a list of embeddings
-embedded_chunks = []
-for item in portfolio_data:
-    text_to_embed = f"{item['type']}: {item['name']}. {item['description']}"
-    embedding = embedding_model.embed_content(model="text-embedding-004", content=text_to_embed)
-    embedded_chunks.append({"text": text_to_embed, "embedding": embedding['embedding'], "tags": item['tags']})
-
-# In a real app, you'd insert embedded_chunks into a vector DB like Pinecone, ChromaDB, etc.
-# For now, let's simulate a "search" function
-def simulated_vector_search(query_embedding: List[float], top_k: int = 3) -> List[str]:
-    # In a real vector DB, this would be an efficient similarity search
-    # Here, we'll just do a very basic dot product similarity for demonstration
-    similarities = []
-    for chunk in embedded_chunks:
-        # Simple dot product similarity (for demonstration only)
-        sim = sum(q * c for q, c in zip(query_embedding, chunk['embedding']))
-        similarities.append((sim, chunk['text']))
-
-    similarities.sort(key=lambda x: x[0], reverse=True)
-    return [text for sim, text in similarities[:top_k]]
\ No newline at end of file
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def chunk_id(item):
+    return f"{item['type']}:{item['name']}"
+
+
+def chunk_text(item):
+    return f"{item['type']}: {item['name']}. {item['description']}"
+
+
+def embed_texts(texts: List[str], task_type: str) -> List[List[float]]:
+    """Embeddings of the texts with one request"""
+    result = get_embedding_client().models.embed_content(
+        model=settings.CHAT_EMBEDDING_MODEL,
+        contents=texts,
+        config={'task_type': task_type},
+    )
+    return [embedding.values for embedding in result.embeddings]
+
+
+def build_portfolio_index(items=portfolio_data, path=None, rebuild=False):
+    """
+    Bring the saved portfolio index in line with the items: only new and changed
+    chunks are embedded, removed ones are deleted. Returns (added, deleted).
+    """
+    path = path or settings.CHAT_VECTOR_INDEX_PATH
+    index = None if rebuild else VectorIndex.load(path, mmap=False)
+
+    chunks = {
+        chunk_id(item): {'text': chunk_text(item), 'tags': item['tags']}
+        for item in items
+    }
+    for chunk in chunks.values():
+        chunk['hash'] = hashlib.sha1(chunk['text'].encode(), usedforsecurity=False).hexdigest()
+
+    changed = [
+        item_id for item_id, chunk in chunks.items()
+        if index is None or (index.get_metadata(item_id) or {}).get('hash') != chunk['hash']
+    ]
+    vectors = embed_texts([chunks[item_id]['text'] for item_id in changed], 'RETRIEVAL_DOCUMENT') if changed else []
+    if index is None or not len(index):
+        index = VectorIndex(len(vectors[0]) if vectors else 0)
+
+    deleted = index.delete([item_id for item_id in index.ids if item_id not in chunks])
+    if changed:
+        index.add(changed, vectors, [chunks[item_id] for item_id in changed])
+    if changed or deleted:
+        index.save(path)
+    return len(changed), deleted
+
+
+def get_portfolio_index():
+    """
+    The saved portfolio index, memory-mapped on first use and reloaded when a
+    build replaced it. None until it is built.
+    """
+    global _index, _index_mtime
+    _matrix_path, sidecar_path = VectorIndex.files(settings.CHAT_VECTOR_INDEX_PATH)
+    try:
+        mtime = os.stat(sidecar_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if mtime != _index_mtime:
+        with _index_lock:
+            if mtime != _index_mtime:
+                _index = VectorIndex.load(settings.CHAT_VECTOR_INDEX_PATH)
+                _index_mtime = mtime
+    return _index
+
+
+def vector_search(query_embedding: List[float], top_k: int = 3) -> List[str]:
+    """Texts of the portfolio chunks most similar to the query embedding"""
+    index = get_portfolio_index()
+    if index is None:
+        return []
+    return [metadata['text'] for _id, _score, metadata in index.search(query_embedding, top_k)]
+
+
+def retrieve_context(query: str, top_k: int = 3) -> List[str]:
+    """Texts of the portfolio chunks most relevant to a visitor query"""
+    if get_portfolio_index() is None:
+        return []
+    query_embedding = embed_texts([query], 'RETRIEVAL_QUERY')[0]
+    return vector_search(query_embedding, top_k)
@@ -3,45 +3,19 @@ from google.generativeai import types
 from django.conf import settings
 from typing import List, Dict
 
-# --- RAG Specific Imports and Setup (Conceptual) ---
-# In a real scenario, you'd initialize your vector DB client here
-# e.g., from pinecone import Pinecone; pinecone = Pinecone(api_key="YOUR_API_KEY")
-# or from chromadb import Client; chroma_client = Client()
-
-# Initialize the embedding model (can be done once)
-embedding_model_name = "text-embedding-004" # Use the latest stable embedding model
+from chat.helpers.embadding import retrieve_context
 
 class AIModelTesting:
     def __init__(self):
         self.gemini_client = genai.Client(api_key=settings.GEMINI_TOKEN)
         self.generation_model = "gemini-1.5-flash" # Your chosen generation model
-        self.embedding_model = genai.get_embedding_model(embedding_model_name)
-
-        # --- IMPORTANT: In a real RAG setup, you'd initialize your vector database client here ---
-        # self.vector_db_client = initialize_your_vector_database_client()
-        # For this example, we'll use the simulated_vector_search function defined above.
 
     def _retrieve_relevant_context(self, query: str) -> List[str]:
         """
         Generates an embedding for the query and retrieves relevant text chunks
-        from your knowledge base using a vector similarity search.
+        from the portfolio vector index, built by `manage.py build_portfolio_index`.
         """
-        # 1. Embed the user query
-        query_embedding_response = self.embedding_model.embed_content(
-            model=embedding_model_name,
-            content=query
-        )
-        query_embedding = query_embedding_response['embedding']
-
-        # 2. Perform similarity search in your vector database
-        # This is where you'd call your vector DB's search method
-        # For example:
-        # retrieved_chunks = self.vector_db_client.query(query_embedding, top_k=3)
-        # return [chunk.text for chunk in retrieved_chunks]
-
-        # --- Using the simulated search for demonstration ---
-        retrieved_chunks = simulated_vector_search(query_embedding, top_k=3)
-        return retrieved_chunks
+        return retrieve_context(query, top_k=3)
 
     def gemini_response(self, user_query: str) -> str:
         print("----------------------------")
@@ -0,0 +1,145 @@
+import os
+import asyncio
+import threading
+import weakref
+import contextvars
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from google import genai
+from huggingface_hub import InferenceClient, AsyncInferenceClient, configure_http_backend
+
+PROVIDER = "fireworks-ai"
+
+_lock = threading.Lock()
+_pid = None
+_clients = {}
+# one connector per event loop, aiohttp connections can't cross loops
+_connectors = weakref.WeakKeyDictionary()
+# session of the last request made by the current task
+_request_session = contextvars.ContextVar('llm_request_session', default=None)
+
+
+def _session_factory():
+    """requests session of a thread, keeping up to LLM_POOL_SIZE connections alive per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=settings.LLM_POOL_SIZE, pool_maxsize=settings.LLM_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _ensure_process():
+    """
+    Set up the registry in this process on first use. A forked child (celery
+    prefork, gunicorn/uvicorn workers) starts over instead of sharing its
+    parent's sockets.
+    """
+    global _pid
+    if _pid == os.getpid():
+        return
+    with _lock:
+        if _pid == os.getpid():
+            return
+        _clients.clear()
+        _connectors.clear()
+        # huggingface_hub keeps one session per process and thread, built by this factory
+        configure_http_backend(backend_factory=_session_factory)
+        _pid = os.getpid()
+
+
+def _shared_connector():
+    loop = asyncio.get_running_loop()
+    connector = _connectors.get(loop)
+    if connector is None or connector.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.LLM_POOL_SIZE,
+            keepalive_timeout=settings.LLM_KEEPALIVE_SECONDS,
+            ttl_dns_cache=300,
+        )
+        _connectors[loop] = connector
+    return connector
+
+
+class PooledAsyncInferenceClient(AsyncInferenceClient):
+    """
+    AsyncInferenceClient opens a session, and so a new TLS connection, per call.
+    Here the sessions borrow their connections from the loop's shared connector,
+    and are registered like the base client's so closing one drops its responses.
+    """
+
+    def _get_client_session(self, headers=None):
+        session = aiohttp.ClientSession(
+            headers={**self.headers, **(headers or {})},
+            cookies=self.cookies,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trust_env=self.trust_env,
+            connector=_shared_connector(),
+            # closing the session after a call keeps the connections open
+            connector_owner=False,
+        )
+        self._sessions[session] = set()
+
+        session._wrapped_request = session._request
+
+        async def _request(method, url, **kwargs):
+            response = await session._wrapped_request(method, url, **kwargs)
+            self._sessions[session].add(response)
+            return response
+
+        session._request = _request
+        session._close = session.close
+
+        async def close_session():
+            # a response left half read closes its connection instead of returning it to the pool
+            for response in self._sessions.pop(session, ()):
+                response.close()
+            await session._close()
+
+        session.close = close_session
+        _request_session.set(session)
+        return session
+
+    async def close_request(self):
+        """Close the session of the current task's last request, when a stream is left before its end"""
+        session = _request_session.get()
+        if session is not None and session in self._sessions:
+            await session.close()
+
+
+def _get_client(key, build):
+    _ensure_process()
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = build()
+    return client
+
+
+def get_inference_client(model_id):
+    """Process wide InferenceClient of a model, created on first use"""
+    return _get_client(
+        (InferenceClient, model_id),
+        lambda: InferenceClient(
+            provider=PROVIDER, api_key=settings.HF_TOKEN, model=model_id, timeout=settings.LLM_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def get_async_inference_client(model_id):
+    """Process wide async client of a model, its connections are pooled per event loop"""
+    return _get_client(
+        (PooledAsyncInferenceClient, model_id),
+        lambda: PooledAsyncInferenceClient(
+            provider=PROVIDER, api_key=settings.HF_TOKEN, model=model_id, timeout=settings.LLM_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def get_embedding_client():
+    """Process wide gemini client, used for the query embeddings"""
+    return _get_client(genai.Client, lambda: genai.Client(api_key=settings.GEMINI_TOKEN))
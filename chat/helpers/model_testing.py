@@ -1,6 +1,8 @@
 from google import genai
 from django.conf import settings
 
+from chat.helpers.embadding import retrieve_context
+
 class AIModelTesting:
     def __init__(self):
         self.gemini_client = genai.Client(api_key=settings.GEMINI_TOKEN)
@@ -16,7 +18,9 @@ class AIModelTesting:
             """
 
     def gemini_response(self, user_query):
-        full_query = self.system_prompt + user_query
+        # portfolio chunks closest to the query, none until build_portfolio_index has run
+        context = '\n'.join(retrieve_context(user_query, top_k=3))
+        full_query = f"{self.system_prompt}\nContext:\n{context}\n\n{user_query}" if context else self.system_prompt + user_query
         response = self.gemini_client.models.generate_content(
             model = self.model,
             contents = full_query,
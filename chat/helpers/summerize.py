@@ -1,7 +1,6 @@
-from django.conf import settings
 from celery import shared_task
-from huggingface_hub import InferenceClient
 from chat.models import Conversation
+from chat.helpers.llm_clients import get_inference_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,11 +9,7 @@ class ConversationSummary:
     """Class to make summary of the conversation"""
     
     def __init__(self, model_id="meta-llama/Llama-3.1-8B-Instruct"):
-        self.client = InferenceClient(
-            provider="fireworks-ai",
-            api_key=settings.HF_TOKEN,
-            model=model_id
-        )
+        self.client = get_inference_client(model_id)
         self.system_prompt = (
             "You are a summarizer. Summarize the conversation between a User and an AI Assistant in a clear, concise single paragraph. "
             "If a previous summary exists, update it to include the latest exchange while preserving essential context for continuity."
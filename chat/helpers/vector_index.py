@@ -0,0 +1,126 @@
+import os
+import json
+import numpy as np
+
+
+def normalize_rows(vectors):
+    """float32 rows of unit length, the dot product of two is their cosine similarity"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class VectorIndex:
+    """
+    Embeddings as the rows of a normalized float32 matrix, with the id and
+    metadata of each row. Saved as `<path>.npy` and a `<path>.json` sidecar,
+    loading memory-maps the matrix so it takes milliseconds and forked workers
+    share its pages.
+    """
+
+    def __init__(self, dim, vectors=None, ids=None, metadata=None):
+        self.dim = dim
+        self.vectors = vectors if vectors is not None else np.empty((0, dim), dtype=np.float32)
+        self.ids = list(ids or [])
+        self.metadata = list(metadata or [{} for _ in self.ids])
+        self.positions = {item_id: position for position, item_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, item_id):
+        return item_id in self.positions
+
+    def get_metadata(self, item_id):
+        position = self.positions.get(item_id)
+        return self.metadata[position] if position is not None else None
+
+    # -------------
+    # Changes
+    # -------------
+    def add(self, ids, vectors, metadata=None):
+        """Add rows, the ids already in the index are replaced"""
+        ids = list(ids)
+        vectors = normalize_rows(vectors)
+        metadata = list(metadata) if metadata is not None else [{} for _ in ids]
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected {len(ids)} vectors of {self.dim} dimensions, got {vectors.shape}")
+
+        self.delete(item_id for item_id in ids if item_id in self.positions)
+        # a memory-mapped matrix is read only, the new one lives in memory until saved
+        self.vectors = np.concatenate([self.vectors, vectors])
+        self.ids.extend(ids)
+        self.metadata.extend(metadata)
+        self.positions.update((item_id, position) for position, item_id in enumerate(ids, start=len(self.positions)))
+
+    def delete(self, ids):
+        """Drop the rows of the ids, unknown ids are ignored. Returns the number dropped."""
+        drop = {self.positions[item_id] for item_id in ids if item_id in self.positions}
+        if not drop:
+            return 0
+
+        keep = np.ones(len(self.ids), dtype=bool)
+        keep[list(drop)] = False
+        self.vectors = self.vectors[keep]
+        self.ids = [item_id for position, item_id in enumerate(self.ids) if keep[position]]
+        self.metadata = [data for position, data in enumerate(self.metadata) if keep[position]]
+        self.positions = {item_id: position for position, item_id in enumerate(self.ids)}
+        return len(drop)
+
+    # -------------
+    # Search
+    # -------------
+    def search(self, query, top_k=3, min_score=None):
+        """
+        The `top_k` rows most similar to the query vector as (id, score, metadata),
+        best first. One matrix product scores every row, argpartition picks the
+        top ones without sorting the rest.
+        """
+        if not self.ids or top_k <= 0:
+            return []
+
+        scores = self.vectors @ normalize_rows(query)[0]
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self.ids[position], float(scores[position]), self.metadata[position])
+            for position in top
+            if min_score is None or scores[position] >= min_score
+        ]
+
+    # -------------
+    # Persistence
+    # -------------
+    @staticmethod
+    def files(path):
+        return f"{path}.npy", f"{path}.json"
+
+    def save(self, path):
+        """Write the matrix then the sidecar, each replacing its file at once"""
+        matrix_path, sidecar_path = self.files(path)
+        os.makedirs(os.path.dirname(matrix_path) or '.', exist_ok=True)
+
+        with open(f"{matrix_path}.tmp", 'wb') as file:
+            np.save(file, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(f"{sidecar_path}.tmp", 'w', encoding='utf-8') as file:
+            json.dump({'dim': self.dim, 'ids': self.ids, 'metadata': self.metadata}, file, ensure_ascii=False)
+        os.replace(f"{matrix_path}.tmp", matrix_path)
+        os.replace(f"{sidecar_path}.tmp", sidecar_path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """The saved index, None if it doesn't exist or its files don't match"""
+        matrix_path, sidecar_path = cls.files(path)
+        try:
+            with open(sidecar_path, encoding='utf-8') as file:
+                sidecar = json.load(file)
+            vectors = np.load(matrix_path, mmap_mode='r' if mmap else None)
+        except FileNotFoundError:
+            return None
+
+        # a save interrupted between the two files
+        if vectors.shape != (len(sidecar['ids']), sidecar['dim']):
+            return None
+        return cls(sidecar['dim'], vectors, sidecar['ids'], sidecar['metadata'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from chat.helpers.embadding import build_portfolio_index
+
+
+class Command(BaseCommand):
+    help = "Embed the new and changed portfolio chunks into the chat vector index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Embed every chunk again, needed after changing the embedding model")
+
+    def handle(self, *args, **options):
+        added, deleted = build_portfolio_index(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f"Embedded {added} portfolio chunks, deleted {deleted}"))
@@ -0,0 +1,116 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from base.models import Visitor
+from chat.helpers.chat_turn import start_turn, generate_reply, finish_turn
+
+
+class SimulatedGenerator:
+    """Stands in for the provider, a reply after a fixed latency"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def generate_response(self, user_query, conversation_summary):
+        time.sleep(self.latency)
+        return f"Simulated reply to: {user_query}"
+
+
+class Command(BaseCommand):
+    """
+    Each chat runs in its own thread, as under a threaded server. A turn closes
+    its thread's connection before the generation whatever CONN_MAX_AGE, so it
+    holds one only during its two short writes and the peak follows the chats
+    writing at the same instant, not the chats waiting on the provider. Chats
+    started together overlap in their first write, hence 13 connections at 30
+    chats rather than a handful. Opening a connection per write is cheap
+    against a local postgres or behind a pooler like pgbouncer, less so over
+    a slow TLS link.
+    """
+    help = "Run concurrent chat turns and report the peak database connections and open transactions (postgres only)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 5, 10, 25, 50], help="Concurrent chats of each round")
+        parser.add_argument('--turns', type=int, default=2, help="Chat turns per concurrent chat")
+        parser.add_argument('--latency', type=float, default=1.0, help="Seconds the simulated provider takes per reply")
+        parser.add_argument('--live', action='store_true', help="Call the real provider instead of the simulated one")
+        parser.add_argument('--in-transaction', action='store_true', help="Hold a transaction around the whole turn, as chats used to")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Connection usage is read from pg_stat_activity, which needs postgres")
+
+        generator = None if options['live'] else SimulatedGenerator(options['latency'])
+        visitor = Visitor.objects.create(device_name='chat load test')
+        # only the chats' connections are counted
+        connection.close()
+        try:
+            self.stdout.write(f"{'chats':>6} {'turns':>6} {'seconds':>8} {'peak conns':>11} {'peak in tx':>11}")
+            for concurrency in options['concurrency']:
+                elapsed, peak_connections, peak_transactions = self.run_round(
+                    visitor, concurrency, options['turns'], generator, options['in_transaction'],
+                )
+                self.stdout.write(
+                    f"{concurrency:>6} {concurrency * options['turns']:>6} {elapsed:>8.2f} "
+                    f"{peak_connections:>11} {peak_transactions:>11}"
+                )
+        finally:
+            # the conversations and messages go with the visitor
+            visitor.delete()
+
+    def run_round(self, visitor, concurrency, turns, generator, in_transaction):
+        def chat(index):
+            conversation_id = None
+            try:
+                for turn in range(turns):
+                    query = f"Load test chat {index} turn {turn}"
+                    if in_transaction:
+                        with transaction.atomic():
+                            conversation_id = self.turn(visitor, query, conversation_id, generator)
+                    else:
+                        conversation_id = self.turn(visitor, query, conversation_id, generator)
+            finally:
+                connections.close_all()
+
+        done = threading.Event()
+        peaks = []
+        sampler = threading.Thread(target=self.sample, args=(done, peaks))
+        sampler.start()
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(chat, range(concurrency)))
+        finally:
+            elapsed = time.monotonic() - started
+            done.set()
+            sampler.join()
+        return elapsed, *peaks
+
+    def turn(self, visitor, query, conversation_id, generator):
+        conversation, _message = start_turn(visitor, query, conversation_id)
+        reply = generate_reply(conversation, query, generator)
+        # the simulated replies aren't worth summarizing
+        finish_turn(conversation, query, reply, summarize=generator is None)
+        return conversation.id
+
+    def sample(self, done, peaks):
+        """Track the most connections and open transactions on the database, the sampler's own left out"""
+        peak_connections = peak_transactions = 0
+        try:
+            with connection.cursor() as cursor:
+                while not done.is_set():
+                    cursor.execute(
+                        "SELECT count(*), count(*) FILTER (WHERE xact_start IS NOT NULL) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                    )
+                    total, in_transaction = cursor.fetchone()
+                    peak_connections = max(peak_connections, total)
+                    peak_transactions = max(peak_transactions, in_transaction)
+                    done.wait(0.05)
+        finally:
+            connections.close_all()
+            peaks.extend([peak_connections, peak_transactions])
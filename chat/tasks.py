@@ -0,0 +1,6 @@
+# Tasks live next to the helpers they belong to, importing them here lets
+# celery's autodiscovery register them in the worker and beat processes.
+from chat.helpers.summerize import summarize_conversation_task
+from chat.helpers.chat_turn import answer_pending_messages_task
+
+__all__ = ['summarize_conversation_task', 'answer_pending_messages_task']
@@ -2,6 +2,10 @@ CHAT_MESSAGE_CREATED = {
     "en": "New message created!"
 }
 
+CHAT_MESSAGE_INVALID = {
+    "en": "Message could not be sent!"
+}
+
 CHAT_CONVERSATION_LIST = {
     "en": "All conversation list received!"
 }
@@ -13,3 +17,12 @@ CHAT_SINGLE_CONVERSATION = {
 CHAT_DELETE_CONVERSATION = {
     "en": "Conversation deleted!"
 }
+
+
+CHAT_ANSWER_CACHE_STATS = {
+    "en": "Answer cache stats received!"
+}
+
+CHAT_ANSWER_CACHE_STATS_RESET = {
+    "en": "Answer cache stats reset!"
+}
\ No newline at end of file
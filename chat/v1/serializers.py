@@ -1,4 +1,3 @@
-from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
@@ -6,8 +5,7 @@ from rest_framework import serializers
 from chat.models import Message, Conversation
 from base.models import Visitor
 
-from chat.choices import MessageSenderChoice
-from chat.helpers.ai_response import generate_ai_response
+from chat.helpers.chat_turn import start_turn, generate_reply, finish_turn
 
 class MessageCreateSerializer(serializers.Serializer):
     """
@@ -32,44 +30,22 @@ class MessageCreateSerializer(serializers.Serializer):
         
         conversation_id = self.context.get('conversation_id')
         
-        with transaction.atomic():
-            # Get or create conversation
-            title = query[:40] if len(query) <= 40 else f"{query[:37]}..."
-            if conversation_id:
-                try:
-                    conversation = Conversation.objects.get(id=conversation_id, user=visitor)
-                except Conversation.DoesNotExist:
-                    # If provided conversation doesn't exist, create a new one
-                    conversation = Conversation.objects.create(user=visitor, title=title)
-            else:
-                conversation = Conversation.objects.create(user=visitor, title=title)
-            
-            # Create user message
-            user_message = Message.objects.create(
-                conversation=conversation,
-                sender=MessageSenderChoice.VISITOR,
-                content=query
-            )
-            
-            # Generate AI respons
-            ai_response_text = generate_ai_response(
-                user_query=query, 
-                conversation_id=conversation.id, 
-                conversation_summary=conversation.summary
-            )
-            
-            # Create AI response message
-            ai_message = Message.objects.create(
-                conversation=conversation,
-                sender=MessageSenderChoice.AI,
-                content=ai_response_text
-            )
-            
-            return {
-                'conversation_id': conversation.id,
-                'user_message': user_message,
-                'ai_response': ai_message
-            }
+        # Store the user message, the conversation is created if not found
+        conversation, user_message = start_turn(visitor, query, conversation_id)
+        
+        # Generate AI response, outside of any transaction so a slow
+        # provider doesn't hold a database connection
+        ai_response_text = generate_reply(conversation, query)
+        
+        # Create AI response message, a message left without one is
+        # answered later by the pending replies task
+        ai_message = finish_turn(conversation, query, ai_response_text)
+        
+        return {
+            'conversation_id': conversation.id,
+            'user_message': user_message,
+            'ai_response': ai_message
+        }
 
 
 class ConversationSerializer(serializers.ModelSerializer):
@@ -1,14 +1,18 @@
 from django.urls import path, include
 from .views import (
     CreateMessage, 
+    StreamMessage,
     ConversationList, 
     SingleConversation, 
     DeleteConversation,
+    AnswerCacheStats,
     AIModelTest
 )
 
 chat_urls = [
     path("create-message/", CreateMessage.as_view(), name="create-message"),
+    path("create-message/stream/", StreamMessage.as_view(), name="stream-message"),
+    path("answer-cache/stats/", AnswerCacheStats.as_view(), name="answer-cache-stats"),
     path("model-test/", AIModelTest.as_view(), name="model-test"),
 ]
 
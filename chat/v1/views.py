@@ -1,10 +1,19 @@
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import generics, status, permissions
 
 from chat.v1 import res_msg
 from base.helpers.response import APIResponse
 from chat.helpers.model_testing import AIModelTesting
+from chat.helpers.chat_turn import start_turn
+from chat.helpers.chat_stream import stream_turn
+from chat.helpers.answer_cache import answer_cache_stats, reset_answer_cache_stats
 
 from chat.models import Conversation, Message
 
@@ -44,6 +53,44 @@ class CreateMessage(generics.CreateAPIView):
         )
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class StreamMessage(View):
+    """
+    Async API View to create new message and stream the AI reply as
+    server-sent events while it is generated, takes the same input as CreateMessage
+    """
+    RES_LANG = 'en'
+    
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        
+        serializer = MessageCreateSerializer(
+            data=data, context={'conversation_id': request.GET.get('conversation_id')}
+        )
+        # DRF views can't be async, the api envelope is built by hand here
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "success": False,
+                "message": str(res_msg.CHAT_MESSAGE_INVALID[self.RES_LANG]),
+                "errors": serializer.errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        query = serializer.validated_data['query']
+        conversation, _message = await sync_to_async(start_turn)(
+            serializer.validated_data['visitor_id'], query, request.GET.get('conversation_id')
+        )
+        
+        response = StreamingHttpResponse(stream_turn(conversation, query), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # nginx would otherwise buffer the whole reply
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 class ConversationList(generics.ListAPIView):
     """API View to get all conversation list"""
     RES_LANG = 'en'
@@ -134,6 +181,22 @@ class DeleteConversation(generics.DestroyAPIView):
         )
 
 
+class AnswerCacheStats(generics.GenericAPIView):
+    """API View to get the hit rate of the answer cache, DELETE resets the counters"""
+    RES_LANG = 'en'
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request, *args, **kwargs):
+        return APIResponse.success(
+            data=answer_cache_stats(),
+            message=res_msg.CHAT_ANSWER_CACHE_STATS[self.RES_LANG]
+        )
+    
+    def delete(self, request, *args, **kwargs):
+        reset_answer_cache_stats()
+        return APIResponse.success(message=res_msg.CHAT_ANSWER_CACHE_STATS_RESET[self.RES_LANG])
+
+
 class AIModelTest(generics.CreateAPIView):
     """API view to test AI model response"""
 
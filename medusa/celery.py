@@ -31,3 +31,27 @@ app.conf.update(
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
 )
+
+# Periodic tasks
+app.conf.beat_schedule = {
+    'flush-blog-view-counts': {
+        'task': 'blogs.helpers.view_counter.flush_view_counts_task',
+        'schedule': float(os.environ.get('BLOG_VIEW_FLUSH_INTERVAL', 30)),  # seconds
+    },
+    'export-static-site': {
+        'task': 'base.helpers.static_export.export_static_site_task',
+        'schedule': float(os.environ.get('STATIC_EXPORT_INTERVAL', 60)),  # seconds
+    },
+    'snapshot-trending-blogs': {
+        'task': 'blogs.helpers.trending.snapshot_trending_blogs_task',
+        'schedule': float(os.environ.get('TRENDING_SNAPSHOT_INTERVAL', 300)),  # seconds
+    },
+    'rollup-blog-read-stats': {
+        'task': 'blogs.helpers.blog_readers.rollup_read_stats_task',
+        'schedule': float(os.environ.get('BLOG_READ_STATS_INTERVAL', 60 * 60)),  # seconds
+    },
+    'answer-pending-chat-messages': {
+        'task': 'chat.helpers.chat_turn.answer_pending_messages_task',
+        'schedule': float(os.environ.get('CHAT_PENDING_REPLY_INTERVAL', 120)),  # seconds
+    },
+}
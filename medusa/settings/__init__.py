@@ -3,3 +3,4 @@ from .core import *
 from .variables import *
 from .middlewares import *
 from .database import *
+from .cache import *
\ No newline at end of file
@@ -0,0 +1,9 @@
+from medusa.settings import CACHE_URL
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+        'KEY_PREFIX': 'medusa',
+    }
+}
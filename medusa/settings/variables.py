@@ -13,6 +13,10 @@ ALLOWED_HOSTS = [host.strip() for host in (os.getenv('ALLOWED_HOSTS') or '').spl
 
 ROOT_URLCONF = 'medusa.urls'
 
+# public frontend, used for links in the sitemap and feeds
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:3000').rstrip('/')
+SITE_NAME = os.getenv('SITE_NAME', 'Medusa')
+
 # JWT
 
 SIMPLE_JWT = {
@@ -30,6 +34,9 @@ PGDB_PASSWORD = os.getenv('PGDB_PASSWORD', 'cleanCodeMyth')
 PGDB_HOST = os.getenv('PGDB_HOST', 'db')
 PGDB_PORT = os.getenv('PGDB_PORT', '5431')
 
+# cache
+CACHE_URL = os.getenv('CACHE_URL', 'redis://localhost:6379/1')
+
 # email
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.getenv('EMAIL_HOST')
@@ -55,4 +62,22 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 # media url
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR, 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+# static json export of the public site
+STATIC_EXPORT_ROOT = os.getenv('STATIC_EXPORT_ROOT', BASE_DIR / 'export')
+# hours for a view to lose half of its weight in the trending ranking
+TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS') or 24)
+# seconds before a chat message without reply is answered by the pending replies task
+CHAT_PENDING_REPLY_SECONDS = int(os.getenv('CHAT_PENDING_REPLY_SECONDS') or 300)
+# connections kept open to the llm provider per host, and seconds an idle one stays open
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE') or 10)
+LLM_KEEPALIVE_SECONDS = float(os.getenv('LLM_KEEPALIVE_SECONDS') or 60)
+# seconds a call to the llm provider may take, a streamed reply included
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS') or 60)
+# answers reused for questions similar above the threshold, a zero size disables the cache
+CHAT_EMBEDDING_MODEL = os.getenv('CHAT_EMBEDDING_MODEL') or 'text-embedding-004'
+CHAT_ANSWER_CACHE_SIZE = int(os.getenv('CHAT_ANSWER_CACHE_SIZE') or 256)
+CHAT_ANSWER_CACHE_TTL = int(os.getenv('CHAT_ANSWER_CACHE_TTL') or 60 * 60 * 24)
+CHAT_ANSWER_CACHE_THRESHOLD = float(os.getenv('CHAT_ANSWER_CACHE_THRESHOLD') or 0.92)
+# portfolio embeddings searched for the chat context, saved as <path>.npy and <path>.json
+CHAT_VECTOR_INDEX_PATH = os.getenv('CHAT_VECTOR_INDEX_PATH') or str(BASE_DIR / 'vector_index' / 'portfolio')
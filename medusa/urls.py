@@ -14,6 +14,7 @@ urlpatterns = [
     path('projects/', include('projects.v1.urls')),
     path('blogs/', include('blogs.v1.urls')),
     path('chat/', include('chat.v1.urls')),
+    path('', include('blogs.v1.feed_urls')),
 ]
 
 if settings.DEBUG:
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from base.helpers.conditional import track_versions
+        from base.helpers.image_variants import register_image_variants
+        from base.helpers.static_export import register_static_export
+        from projects.models import Project, ProjectImage
+        from projects.helpers.static_export import export_projects
+
+        track_versions('projects', Project, ProjectImage)
+        register_image_variants(ProjectImage, 'image')
+        register_static_export(export_projects)
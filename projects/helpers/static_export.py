@@ -0,0 +1,15 @@
+from base.helpers.conditional import get_versions
+from projects.models import Project
+from projects.v1.serializers import ProjectDetailsSerializer
+
+
+def _projects():
+    projects = ProjectDetailsSerializer(Project.objects.prefetch_related('images'), many=True).data
+    yield "projects/index.json", projects
+    for project in projects:
+        yield f"projects/{project['id']}.json", project
+
+
+def export_projects(export):
+    """Export the project index and every project"""
+    export.export_group('projects', get_versions('projects')['projects'], _projects)
@@ -39,6 +39,7 @@ class ProjectImage(models.Model):
         Project, on_delete=models.CASCADE, related_name="images"
     )
     image = models.ImageField(upload_to="project_images/")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
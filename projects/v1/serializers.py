@@ -2,12 +2,15 @@ from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 
+from base.helpers.image_variants import ImageVariantsField
 from projects.models import Project, ProjectImage
 
 class ProjectImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = ProjectImage
-        fields = ['id', 'image', 'created_at']
+        fields = ['id', 'image', 'image_variants', 'created_at']
 
 
 class CreateProjectSerializer(serializers.ModelSerializer):
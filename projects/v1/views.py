@@ -3,6 +3,7 @@ from rest_framework import generics, status, permissions
 # helpers
 from projects.v1 import res_msg
 from base.helpers.response import APIResponse
+from base.helpers.conditional import ConditionalGetMixin
 
 # models
 from projects.models import Project
@@ -34,11 +35,12 @@ class CreateNewProject(generics.CreateAPIView):
         )
 
 
-class ProjectList(generics.ListAPIView):
+class ProjectList(ConditionalGetMixin, generics.ListAPIView):
     """
     API view to get project list
     """
     RES_LANG = "en"
+    version_scope = "projects"
     permission_classes = [permissions.AllowAny]
     serializer_class = ProjectDetailsSerializer
     queryset = Project.objects.all()
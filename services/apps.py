@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'services'
+
+    def ready(self):
+        from base.helpers.conditional import track_versions
+        from base.helpers.image_variants import register_image_variants
+        from base.helpers.static_export import register_static_export
+        from services.models import Services, Skills, Experience
+        from services.helpers.static_export import export_services
+
+        track_versions('services', Services)
+        track_versions('skills', Skills)
+        track_versions('experiences', Experience)
+        register_image_variants(Experience, 'company_logo')
+        register_static_export(export_services)
@@ -0,0 +1,17 @@
+from base.helpers.conditional import get_versions
+from services.models import Services, Skills, Experience
+from services.v1.serializer import ServiceDetailsSerializer, SkillDetailsSerializer, ExperienceDetailsSerializer
+
+
+def export_services(export):
+    """Export the services, skills and experiences, one file each"""
+    versions = get_versions('services', 'skills', 'experiences')
+    export.export_group('services', versions['services'], lambda: [
+        ("services.json", ServiceDetailsSerializer(Services.objects.all(), many=True).data)
+    ])
+    export.export_group('skills', versions['skills'], lambda: [
+        ("skills.json", SkillDetailsSerializer(Skills.objects.all(), many=True).data)
+    ])
+    export.export_group('experiences', versions['experiences'], lambda: [
+        ("experiences.json", ExperienceDetailsSerializer(Experience.objects.all(), many=True).data)
+    ])
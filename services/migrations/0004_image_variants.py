@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_alter_experience_options_remove_experience_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='company_logo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -77,6 +77,7 @@ class Experience(models.Model):
     company_name = models.CharField(max_length=64)
     company_location = models.CharField(max_length=64)
     company_logo = models.ImageField(upload_to="work_experiences/")
+    company_logo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
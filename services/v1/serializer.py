@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from base.helpers.image_variants import ImageVariantsField
 from services.models import Services, Skills, Experience
 
 
@@ -55,6 +56,8 @@ class CreateExperienceSerializer(serializers.ModelSerializer):
 
 class ExperienceDetailsSerializer(serializers.ModelSerializer):
     """Serializer to show experiences"""
+    company_logo_variants = ImageVariantsField()
+
     class Meta:
         model = Experience
         fields = '__all__'
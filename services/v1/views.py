@@ -4,6 +4,7 @@ from rest_framework import generics, permissions, status
 # helpers
 from services.v1 import res_msg
 from base.helpers.response import APIResponse
+from base.helpers.conditional import ConditionalGetMixin
 
 # models
 from services.models import Services, Skills, Experience
@@ -40,9 +41,10 @@ class CreateNewService(generics.CreateAPIView):
             status=status.HTTP_201_CREATED
         )
 
-class ServiceList(generics.ListAPIView):
+class ServiceList(ConditionalGetMixin, generics.ListAPIView):
     """API View to get service list"""
     RES_LANG = 'en'
+    version_scope = 'services'
     serializer_class = ServiceDetailsSerializer
     queryset = Services.objects.all()
 
@@ -120,9 +122,10 @@ class CreateNewSkills(generics.CreateAPIView):
             status=status.HTTP_201_CREATED
         )
 
-class SkillList(generics.ListAPIView):
+class SkillList(ConditionalGetMixin, generics.ListAPIView):
     """API View to get skill list"""
     RES_LANG = 'en'
+    version_scope = 'skills'
     serializer_class = SkillDetailsSerializer
     queryset = Skills.objects.all()
 
@@ -193,9 +196,10 @@ class CreateNewExperience(generics.CreateAPIView):
             status=status.HTTP_201_CREATED
         )
 
-class ExperienceList(generics.ListAPIView):
+class ExperienceList(ConditionalGetMixin, generics.ListAPIView):
     """API View to get experience list"""
     RES_LANG = 'en'
+    version_scope = 'experiences'
     serializer_class = ExperienceDetailsSerializer
     queryset = Experience.objects.all()
 